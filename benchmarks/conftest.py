@@ -0,0 +1,47 @@
+"""Synthetic cables and tables for the benchmarks."""
+
+import numpy as np
+import pytest
+
+SEGMENT_MIXES = {
+    "straight": ["straight"],
+    "parabolic": ["parabolic"],
+    "reverse_curve": ["reverse_curve"],
+    "mixed": ["straight", "reverse_curve", "straight", "parabolic"],
+}
+
+
+def make_control_points(n_segments, seed=0):
+    """Return n_segments + 1 control points about 2.5 m apart."""
+    rng = np.random.default_rng(seed)
+    x = np.concatenate(([0.0], np.cumsum(rng.uniform(1.0, 4.0, n_segments))))
+    y = rng.uniform(0.1, 2.5, n_segments + 1)
+    return list(zip(x.tolist(), y.tolist()))
+
+
+def make_segment_types(n_segments, mix="mixed"):
+    pattern = SEGMENT_MIXES[mix]
+    return [pattern[i % len(pattern)] for i in range(n_segments)]
+
+
+def make_rows(n_segments, seed=0):
+    """Return a segments table as the app's DataTable sends it."""
+    points = make_control_points(n_segments, seed)
+    segment_types = make_segment_types(n_segments)
+    return [
+        {
+            "sl-no": i + 1,
+            "segment_type": segment_types[i],
+            "segment_start_x": points[i][0],
+            "segment_start_y": points[i][1],
+            "segment_end_x": points[i + 1][0],
+            "segment_end_y": points[i + 1][1],
+        }
+        for i in range(n_segments)
+    ]
+
+
+def skip_if_larger_than(n_points, limit=5_000_000):
+    """Skip parameter combinations that would not fit a quick benchmark run."""
+    if n_points > limit:
+        pytest.skip(f"{n_points} points is above the {limit} point limit")
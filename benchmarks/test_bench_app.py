@@ -0,0 +1,76 @@
+"""Benchmarks for the Dash app callbacks, called directly with synthetic tables."""
+
+import copy
+
+import pytest
+
+pytest.importorskip("dash")
+
+from cableprofile import app  # noqa: E402
+
+from .conftest import make_rows  # noqa: E402
+
+TABLE_SIZES = [5, 100, 1_000]
+
+
+def _reset_app_state():
+    # measure the computation, not the profile cache or the last cable
+    app.profile_cache.clear()
+    app._last_cable = None
+
+
+@pytest.mark.parametrize("symmetric", [False, True])
+@pytest.mark.parametrize("n_rows", TABLE_SIZES)
+def test_get_profile(benchmark, n_rows, symmetric):
+    rows = make_rows(n_rows)
+    benchmark.pedantic(
+        app.get_profile,
+        args=(rows, 0.050, symmetric),
+        setup=_reset_app_state,
+        rounds=10,
+    )
+
+
+@pytest.mark.parametrize("n_rows", TABLE_SIZES)
+def test_plot_cable_profile(benchmark, n_rows):
+    rows = make_rows(n_rows)
+    benchmark.pedantic(
+        app.plot_cable_profile,
+        args=(rows, None, 0.050, False),
+        setup=_reset_app_state,
+        rounds=5,
+    )
+
+
+@pytest.mark.parametrize("n_rows", TABLE_SIZES)
+def test_edit_one_point(benchmark, n_rows):
+    # re-plot after moving one control point, with the previous cable kept
+    rows = make_rows(n_rows)
+    edited = copy.deepcopy(rows)
+    edited[n_rows // 2]["segment_start_y"] += 0.1
+    edited[n_rows // 2 - 1]["segment_end_y"] += 0.1
+
+    def setup():
+        _reset_app_state()
+        app.get_profile(rows, 0.050, False)
+
+    benchmark.pedantic(
+        app.get_profile, args=(edited, 0.050, False), setup=setup, rounds=10
+    )
+
+
+@pytest.mark.parametrize("n_rows", TABLE_SIZES)
+def test_plot_edit_one_point(benchmark, n_rows):
+    # re-plot after moving one control point, sending a patch of the figure
+    rows = make_rows(n_rows)
+    edited = copy.deepcopy(rows)
+    edited[n_rows // 2]["segment_start_y"] += 0.1
+    edited[n_rows // 2 - 1]["segment_end_y"] += 0.1
+
+    def setup():
+        _reset_app_state()
+        app.displayed_cache.clear()
+        _, _, key, _ = app.plot_cable_profile(rows, None, 0.050, False)
+        return (edited, None, 0.050, False, key), {}
+
+    benchmark.pedantic(app.plot_cable_profile, setup=setup, rounds=10)
@@ -0,0 +1,79 @@
+"""Benchmarks for the geometry engine.
+
+Run with ``make bench``, or::
+
+    pytest benchmarks --benchmark-autosave
+
+Results are saved as JSON under .benchmarks/ and can be compared with
+``pytest benchmarks --benchmark-compare``.
+"""
+
+import numpy as np
+import pytest
+
+from cableprofile.cableprofile import (
+    Cable2D,
+    CableBatch,
+    Parabolic,
+    ReverseCurve,
+    Straight,
+)
+
+from .conftest import (
+    SEGMENT_MIXES,
+    make_control_points,
+    make_segment_types,
+    skip_if_larger_than,
+)
+
+SEGMENT_COUNTS = [5, 100, 1_000, 10_000]
+INTERVALS = [0.050, 0.010, 0.001]
+
+
+@pytest.mark.parametrize("interval", INTERVALS)
+@pytest.mark.parametrize("n_segments", SEGMENT_COUNTS)
+def test_profile(benchmark, n_segments, interval):
+    points = make_control_points(n_segments)
+    skip_if_larger_than(points[-1][0] / interval)
+    cable = Cable2D(points, make_segment_types(n_segments))
+    benchmark(cable.profile, interval)
+
+
+@pytest.mark.parametrize("mix", SEGMENT_MIXES)
+def test_profile_segment_mix(benchmark, mix):
+    cable = Cable2D(make_control_points(100), make_segment_types(100, mix))
+    benchmark(cable.profile, 0.010)
+
+
+@pytest.mark.parametrize("segment_class", [Straight, Parabolic, ReverseCurve])
+def test_get_coordinates(benchmark, segment_class):
+    segment = segment_class((0.0, 2.0), (100.0, 0.5))
+    benchmark(segment.get_coordinates, 0.001)
+
+
+@pytest.mark.parametrize("n_segments", SEGMENT_COUNTS)
+def test_cable2d_init(benchmark, n_segments):
+    points = make_control_points(n_segments)
+    segment_types = make_segment_types(n_segments)
+    benchmark(Cable2D, points, segment_types)
+
+
+def test_evaluate(benchmark):
+    cable = Cable2D(make_control_points(200), make_segment_types(200))
+    x = np.random.default_rng(0).uniform(0.0, cable.control_points_list[-1][0], 10**6)
+    benchmark(cable.evaluate, x)
+
+
+def test_iter_profile(benchmark):
+    cable = Cable2D(make_control_points(100), make_segment_types(100))
+    benchmark(lambda: sum(len(c) for c in cable.iter_profile(0.001)))
+
+
+@pytest.mark.parametrize("n_cables", [10, 500])
+def test_batch_profile(benchmark, n_cables):
+    cables = [
+        Cable2D(make_control_points(20, seed), make_segment_types(20))
+        for seed in range(n_cables)
+    ]
+    batch = CableBatch.from_cables(cables)
+    benchmark(batch.profile, 0.050)
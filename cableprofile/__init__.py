@@ -1,5 +1,53 @@
-"""Top-level package for cableprofile."""
+"""Top-level package for cableprofile.
+
+The public API is imported lazily (PEP 562): ``from cableprofile import
+Cable2D`` only imports the geometry core, which needs NumPy alone, and the
+app with Dash is never imported by the package.
+"""
+
+import importlib
 
 __author__ = """Anuv Chakraborty"""
 __email__ = "anuv.chakrabo@gmail.com"
 __version__ = "0.0.1"
+
+# public name -> the submodule defining it
+_exports = {
+    "Cable2D": "cableprofile",
+    "Cable3D": "cableprofile",
+    "CableBatch": "cableprofile",
+    "CableSegment": "cableprofile",
+    "Straight": "cableprofile",
+    "Parabolic": "cableprofile",
+    "ReverseCurve": "cableprofile",
+    "SEGMENT_TYPE_CODES": "cableprofile",
+    "SEGMENT_TYPE_NAMES": "cableprofile",
+    "SUMMARY_DTYPE": "cableprofile",
+    "register_segment_type": "cableprofile",
+    "segment_type_codes": "cableprofile",
+    "mirror_profile": "cableprofile",
+    "repeat_profile": "cableprofile",
+    "iter_mirrored_profile": "cableprofile",
+    "save_profile": "export",
+    "save_container": "export",
+    "load_container": "export",
+    "downsample": "downsample",
+    "force_profile": "losses",
+    "sweep": "sweep",
+    "clearance_violations": "clearance",
+    "cover_violations": "clearance",
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    if name not in _exports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{_exports[name]}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
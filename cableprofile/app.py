@@ -1,11 +1,47 @@
+import json
+import os
+import re
+import threading
+import time
+import uuid
 from collections import OrderedDict
+from urllib.parse import quote
 
 import dash_daq as daq
-import pandas as pd
-import plotly.express as px
-from dash import Dash, Input, Output, State, callback, dash_table, dcc, exceptions, html
-
-from cableprofile import Cable2D
+import numpy as np
+from dash import (
+    ClientsideFunction,
+    Dash,
+    DiskcacheManager,
+    Input,
+    Output,
+    Patch,
+    State,
+    callback,
+    dash_table,
+    dcc,
+    html,
+    no_update,
+)
+from flask import Response, abort, g, request, send_file
+
+from cableprofile import metrics
+from cableprofile.cableprofile import (
+    SEGMENT_TYPE_NAMES,
+    Cable2D,
+    iter_mirrored_profile,
+    mirror_profile,
+    segment_type_codes,
+)
+from cableprofile.cache import ProfileCache, profile_key
+from cableprofile.downsample import downsample
+from cableprofile.export import (
+    formats,
+    iter_csv,
+    save_profile as save_profile_file,
+    write_csv,
+)
+from cableprofile.session import SessionStore
 
 app = Dash(__name__)
 app.title = "cableprofile"
@@ -17,27 +53,113 @@ introduction = [
     ". For reporting problems or suggesting enhancements, please email: anuv.chakrabo[at]gmail.com.",
 ]
 
-# defaults
-default_df = pd.DataFrame(
-    OrderedDict(
-        [
-            ("sl-no", [1, 2, 3, 4, 5]),
-            (
-                "segment_type",
-                ["straight", "reverse_curve", "straight", "parabolic", "straight"],
-            ),
-            ("segment_start_x", [0.000, 1.550, 4.550, 10.550, 12.550]),
-            ("segment_start_y", [2.325, 2.233, 2.303, 1.945, 1.886]),
-            ("segment_end_x", [1.550, 4.550, 10.550, 12.550, 15.050]),
-            ("segment_end_y", [2.233, 2.303, 1.945, 1.886, 1.886]),
-        ]
-    )
+# defaults; pandas and plotly are only imported by the callbacks that use
+# them, so that importing the app stays fast
+default_table = OrderedDict(
+    [
+        ("sl-no", [1, 2, 3, 4, 5]),
+        (
+            "segment_type",
+            ["straight", "reverse_curve", "straight", "parabolic", "straight"],
+        ),
+        ("segment_start_x", [0.000, 1.550, 4.550, 10.550, 12.550]),
+        ("segment_start_y", [2.325, 2.233, 2.303, 1.945, 1.886]),
+        ("segment_end_x", [1.550, 4.550, 10.550, 12.550, 15.050]),
+        ("segment_end_y", [2.233, 2.303, 1.945, 1.886, 1.886]),
+    ]
 )
+default_rows = [
+    dict(zip(default_table, values)) for values in zip(*default_table.values())
+]
 default_interval = 0.050
 default_symmetric = False
 default_filename = "cableprofile.csv"
+# number of profile points written to the csv download at a time
+csv_chunk_size = 65536
+# csv files written by background jobs and not fetched within this many
+# seconds are removed
+download_ttl = 3600
+# above this many edited control points/segments the cable is rebuilt
+max_incremental_edits = 8
+# the graph shows at most about this many points (plus the control points);
+# the download always has the full profile
+display_points = 4000
+# above this many points the graph is drawn with WebGL instead of SVG
+webgl_threshold = 1000
+
+# profiles of more points than this are computed by background callbacks,
+# outside the web worker, and smaller ones synchronously
+background_points = int(os.environ.get("CABLEPROFILE_BACKGROUND_POINTS", 1_000_000))
+# the background callbacks report their progress after each chunk
+progress_chunk_size = 262144
+
+
+def make_background_manager():
+    # background jobs run in processes started by a diskcache manager, which
+    # keeps their progress and results; set CABLEPROFILE_JOBS_DIR to share it
+    # between worker processes. Without diskcache (and its multiprocess and
+    # psutil dependencies) every profile is computed synchronously.
+    try:
+        import diskcache
+
+        return DiskcacheManager(diskcache.Cache(os.environ.get("CABLEPROFILE_JOBS_DIR")))
+    except ImportError:
+        return None
+
+
+background_manager = make_background_manager()
+
+
+def cache_directory():
+    # set CABLEPROFILE_CACHE_DIR to share the profile caches between worker
+    # processes. The background jobs run in processes of their own, so with a
+    # job manager the caches are kept in the job cache directory by default,
+    # where the web workers find the profiles the jobs computed.
+    directory = os.environ.get("CABLEPROFILE_CACHE_DIR")
+    if not directory and background_manager is not None:
+        directory = os.path.join(background_manager.handle.directory, "profiles")
+    return directory or None
+
+
+cache_dir = cache_directory()
+# profiles shared by the plot and download callbacks
+profile_cache = ProfileCache(
+    maxsize=int(os.environ.get("CABLEPROFILE_CACHE_SIZE", 64)),
+    directory=cache_dir,
+)
+# the coordinates drawn by recent figures, by profile key, so that the next
+# figure can be sent as a patch of the one in the browser
+displayed_cache = ProfileCache(
+    maxsize=int(os.environ.get("CABLEPROFILE_CACHE_SIZE", 64)),
+    directory=os.path.join(cache_dir, "displayed") if cache_dir else None,
+)
+# a figure changing more than this fraction of its points is sent whole
+max_patch_fraction = 0.5
+
+
+def make_session_store():
+    # opt in with CABLEPROFILE_SESSIONS=memory, or the path of a SQLite file
+    # shared by the worker processes; the browser then sends only the changed
+    # table rows and each session keeps its rows and cable on the server
+    sessions = os.environ.get("CABLEPROFILE_SESSIONS")
+    if not sessions:
+        return None
+    return SessionStore(
+        ttl=float(os.environ.get("CABLEPROFILE_SESSION_TTL", 3600)),
+        path=None if sessions == "memory" else sessions,
+    )
+
+
+session_store = make_session_store()
 
 segment_types = ["straight", "reverse_curve", "parabolic"]
+segment_columns = [
+    "segment_type",
+    "segment_start_x",
+    "segment_start_y",
+    "segment_end_x",
+    "segment_end_y",
+]
 
 app.layout = html.Div(
     [
@@ -69,10 +191,25 @@ app.layout = html.Div(
             dcc.Graph(id="cable2d_profile_graph"),
             className="cable2d_profile_graph",
         ),
+        html.Progress(
+            id="profile_progress",
+            className="profile_progress",
+            value="0",
+            style={"visibility": "hidden"},
+        ),
+        # the inputs of the profiles too large to compute synchronously
+        dcc.Store(id="background_profile"),
+        # the profile key of the figure in the browser
+        dcc.Store(id="figure_key"),
+        # with server-side sessions, the rows changed by an edit, and the
+        # server asking resync_session for the whole table
+        dcc.Store(id="table_diff"),
+        dcc.Store(id="session_status"),
+        dcc.Store(id="background_download"),
         html.Div(
             dash_table.DataTable(
                 id="segments_table",
-                data=default_df.to_dict("records"),
+                data=default_rows,
                 columns=[
                     {
                         "id": "sl-no",
@@ -221,8 +358,31 @@ app.layout = html.Div(
                     placeholder="filename",
                     debounce=True,
                 ),
-                html.Button("download_csv", className="download_button", id="btn_csv"),
+                dcc.Dropdown(
+                    id="download_dtype",
+                    className="download_dtype",
+                    options=["float64", "float32"],
+                    value="float64",
+                    clearable=False,
+                ),
+                html.Button("download", className="download_button", id="btn_csv"),
                 dcc.Download(id="download-dataframe-csv"),
+                # csv downloads post the table to download_profile_csv, which
+                # streams the file, or fetch the file written by a background job
+                dcc.Store(id="csv_download"),
+                html.Form(
+                    dcc.Input(id="download_request", type="hidden", name="request"),
+                    id="download_form",
+                    action=app.get_relative_path("/download/profile"),
+                    method="POST",
+                    style={"display": "none"},
+                ),
+                html.Progress(
+                    id="download_progress",
+                    className="download_progress",
+                    value="0",
+                    style={"visibility": "hidden"},
+                ),
             ],
             className="download_csv",
         ),
@@ -231,89 +391,312 @@ app.layout = html.Div(
 )
 
 
+profile_inputs = [
+    Input("segments_table", "data"),
+    Input("interval", "value"),
+    Input("symmetric_switch", "on"),
+]
+
+
 @callback(
     Output("cable2d_profile_graph", "figure"),
-    Input("segments_table", "data"),
+    Output("background_profile", "data"),
+    Output("figure_key", "data"),
+    Output("session_status", "data"),
+    # with sessions, the table diff instead of the whole table
+    Input("segments_table" if session_store is None else "table_diff", "data"),
     Input("segments_table", "columns"),
     Input("interval", "value"),
     Input("symmetric_switch", "on"),
+    State("figure_key", "data"),
 )
-def plot_cable_profile(rows, columns, interval, symmetric):
-    profile_df = get_profile(rows, interval, symmetric)
-    fig = px.line(profile_df, x="x", y="y")
-    fig.update_yaxes(scaleratio=1)
+def plot_cable_profile(rows, columns, interval, symmetric, shown_key=None):
+    if session_store is None:
+        return (*plot_rows(rows, interval, symmetric, shown_key), no_update)
+    diff = rows
+    rows, state = session_rows(diff)
+    if rows is None:
+        # left to resync_session, which reads the whole table
+        return no_update, no_update, no_update, {"resync": time.time()}
+    return (
+        *plot_rows(rows, interval, symmetric, shown_key, diff["session"], state),
+        no_update,
+    )
+
+
+def resync_session(status, rows, diff, interval, symmetric, shown_key):
+    # plot the whole table of a session the server lost track of
+    state = {"rows": rows, "version": diff["version"]}
+    return plot_rows(rows, interval, symmetric, shown_key, diff["session"], state)
+
+
+def plot_rows(rows, interval, symmetric, shown_key=None, session=None, state=None):
+    # the figure, or a patch of the shown one, the background request and the
+    # profile key; the session state is stored with its updated cable
+    arrays = get_cable_arrays(rows) if rows else None
+    if in_background(rows, interval, symmetric, arrays):
+        # left to plot_cable_profile_background
+        request = {"rows": rows, "interval": interval, "symmetric": symmetric}
+        if session is not None:
+            session_store.set(session, state)
+        return no_update, request, no_update
+    key = profile_key(rows, interval, symmetric)
+    profile_df = get_profile(rows, interval, symmetric, arrays, state)
+    if session is not None:
+        session_store.set(session, state)
+    coordinates = displayed_coordinates(profile_df.to_numpy(), arrays, symmetric)
+    shown = displayed_cache.get(shown_key) if shown_key else None
+    fig = figure_patch(shown, coordinates) if shown is not None else None
+    if fig is None:
+        fig = profile_figure(coordinates)
+    displayed_cache.set(key, coordinates)
+    return fig, no_update, key
+
+
+def session_rows(diff):
+    # the rows of a session after a table diff and the new session state, or
+    # None if the diff is not the whole table and the session is unknown or
+    # has missed an earlier diff
+    if "rows" in diff:
+        return diff["rows"], {"rows": diff["rows"], "version": diff["version"]}
+    state = session_store.get(diff["session"])
+    if state is not None and state["version"] == diff["version"]:
+        # the diff already applied, sent again with a new interval or symmetry
+        return state["rows"], state
+    if state is None or state["version"] != diff["base"]:
+        return None, None
+    rows = state["rows"][: diff["n_rows"]]
+    rows += [None] * (diff["n_rows"] - len(rows))
+    for i, row in diff["changes"].items():
+        rows[int(i)] = row
+    return rows, dict(state, rows=rows, version=diff["version"])
+
+
+def plot_cable_profile_background(set_progress, request):
+    rows, interval, symmetric = request["rows"], request["interval"], request["symmetric"]
+    arrays = get_cable_arrays(rows)
+    key = profile_key(rows, interval, symmetric)
+    coordinates = profile_cache.get_or_compute(
+        key, lambda: compute_profile(*arrays, interval, symmetric, set_progress)
+    )
+    coordinates = displayed_coordinates(coordinates, arrays, symmetric)
+    displayed_cache.set(key, coordinates)
+    return profile_figure(coordinates), key
+
+
+def displayed_coordinates(coordinates, arrays, symmetric):
+    # the points drawn: about display_points of them, keeping the control points
+    if len(coordinates) <= display_points:
+        return coordinates
+    with metrics.timer("downsample"):
+        keep_x = arrays[0][:, 0]
+        if symmetric:
+            keep_x = np.concatenate((keep_x, 2 * keep_x[-1] - keep_x[-2::-1]))
+        return downsample(coordinates, display_points, keep_x)
+
+
+def profile_figure(coordinates):
+    import pandas as pd
+    import plotly.express as px
+
+    with metrics.timer("figure"):
+        fig = px.line(
+            pd.DataFrame(coordinates, columns=["x", "y"]),
+            x="x",
+            y="y",
+            render_mode="webgl" if len(coordinates) > webgl_threshold else "svg",
+        )
+        fig.update_yaxes(scaleratio=1)
+        # with plain lists for x and y, which the patches of figure_patch index
+        # into (plotly may otherwise send arrays as base64 typed arrays)
+        fig = fig.to_plotly_json()
+        fig["data"][0].update(x=coordinates[:, 0].tolist(), y=coordinates[:, 1].tolist())
+    return fig
+
+
+def figure_patch(shown, coordinates):
+    # a Patch turning the figure drawing shown into the one drawing
+    # coordinates: only the run of points between the unchanged start and end
+    # of the trace is sent. None if the whole figure should be sent instead.
+    if not len(shown) or not len(coordinates):
+        return None
+    if (len(shown) > webgl_threshold) != (len(coordinates) > webgl_threshold):
+        # the trace type changes
+        return None
+    n = min(len(shown), len(coordinates))
+    changed = (shown[:n] != coordinates[:n]).any(axis=1)
+    start = int(changed.argmax()) if changed.any() else n
+    changed = (shown[::-1][: n - start] != coordinates[::-1][: n - start]).any(axis=1)
+    end = int(changed.argmax()) if changed.any() else n - start
+    old = shown[start : len(shown) - end]
+    new = coordinates[start : len(coordinates) - end]
+    if not len(old) and not len(new):
+        return no_update
+    if max(len(old), len(new)) > max_patch_fraction * len(coordinates):
+        return None
+    with metrics.timer("figure"):
+        fig = Patch()
+        common = min(len(old), len(new))
+        for axis, name in enumerate("xy"):
+            values = fig["data"][0][name]
+            for i, value in enumerate(new[:, axis].tolist()):
+                if i < common:
+                    values[start + i] = value
+                else:
+                    values.insert(start + i, value)
+            for _ in range(common, len(old)):
+                del values[start + common]
     return fig
 
 
-def get_profile(rows, interval, symmetric):
+def in_background(rows, interval, symmetric, arrays=None):
+    # whether the profile is too large to compute in the web worker
+    if background_manager is None or not rows or not interval or interval <= 0:
+        return False
+    control_points = (arrays if arrays is not None else get_cable_arrays(rows))[0]
+    # about the number of points, without building the cable
+    span = abs(control_points[-1, 0] - control_points[0, 0])
+    n_points = (span / interval + len(control_points)) * (2 if symmetric else 1)
+    if n_points <= background_points:
+        return False
+    return profile_cache.get(profile_key(rows, interval, symmetric)) is None
+
+
+def compute_profile(control_points, segment_codes, interval, symmetric, set_progress):
+    # the profile a chunk at a time, reporting the number of points computed
+    cable = Cable2D.from_arrays(
+        control_points[:, 0], control_points[:, 1], segment_codes, allow_unknown=True
+    )
+    total = cable.point_count(interval)
+    if symmetric:
+        total = 2 * total - 1
+    chunks = []
+    n_points = 0
+    for chunk in iter_profile_chunks(cable, interval, symmetric, progress_chunk_size):
+        chunks.append(chunk)
+        n_points += len(chunk)
+        set_progress((str(n_points), str(total)))
+    return np.concatenate(chunks)
+
+
+def iter_profile_chunks(cable, interval, symmetric, chunk_size):
+    if symmetric:
+        return iter_mirrored_profile(cable, interval, chunk_size)
+    return cable.iter_profile(interval, chunk_size)
+
+
+def get_profile(rows, interval, symmetric, arrays=None, state=None):
+    import pandas as pd
+
     # if rows is empty return empty dataframe
     if not rows:
         return pd.DataFrame(columns=["x", "y"])
-    control_points = get_control_points_from_table(rows, symmetric)
-    segment_type_list = get_segment_type_list(rows, symmetric)
-    profile_df = pd.DataFrame(
-        get_coordinates(control_points, segment_type_list, interval), columns=["x", "y"]
+    coordinates = profile_cache.get_or_compute(
+        profile_key(rows, interval, symmetric),
+        lambda: get_coordinates(
+            *(arrays if arrays is not None else get_cable_arrays(rows)),
+            interval,
+            symmetric,
+            state,
+        ),
     )
+    with metrics.timer("dataframe"):
+        profile_df = pd.DataFrame(coordinates, columns=["x", "y"])
     return profile_df
 
 
-def get_control_points_from_table(rows, symmetric):
-    control_points = [(row["segment_start_x"], row["segment_start_y"]) for row in rows]
-    # add the last point/mid point
-    control_points.append((rows[-1]["segment_end_x"], rows[-1]["segment_end_y"]))
-    if symmetric:
-        mirrored_control_points = []
-        end_of_cable_x = rows[-1]["segment_end_x"]
-        # loop the rows in reverse with index
-        for row in rows[::-1]:
-            x_difference = row["segment_end_x"] - row["segment_start_x"]
-            end_of_cable_x += x_difference
-            mirrored_control_points.append((end_of_cable_x, row["segment_start_y"]))
-        control_points.extend(mirrored_control_points)
-    return control_points
-
-
-def get_segment_type_list(rows, symmetric):
-    if symmetric:
-        return [row["segment_type"] for row in rows] + [
-            row["segment_type"] for row in rows[::-1]
-        ]
-    else:
-        return [row["segment_type"] for row in rows]
+@metrics.timed("control_points")
+def get_cable_arrays(rows):
+    import pandas as pd
+
+    # convert the table rows to columns once: the (n + 1, 2) control points,
+    # the last one being the end of the last segment, and the segment type codes
+    table = pd.DataFrame.from_records(rows, columns=segment_columns)
+    control_points = np.empty((len(table) + 1, 2))
+    control_points[:-1] = table[["segment_start_x", "segment_start_y"]].to_numpy(float)
+    control_points[-1] = table[["segment_end_x", "segment_end_y"]].iloc[-1]
+    return control_points, segment_type_codes(table["segment_type"].to_numpy())
 
 
-def get_coordinates(control_points, segment_type_list, interval):
-    cable = Cable2D(control_points, segment_type_list)
-    coordinates = cable.profile(interval)
+# the last cable plotted, kept so that a table edit only re-evaluates the
+# segments it touched; with sessions each session keeps its own. The lock only
+# guards taking and putting back the cable: while one callback uses it, the
+# others find none and build their own instead of waiting.
+_last_cable = None
+_last_cable_lock = threading.Lock()
+
+
+def get_coordinates(control_points, segment_codes, interval, symmetric=False, state=None):
+    # a symmetric cable is evaluated up to its axis and mirrored; the cable of
+    # the session state is used and updated if given
+    global _last_cable
+    if state is None:
+        with _last_cable_lock:
+            cable, _last_cable = _last_cable, None
+    else:
+        cable = state.get("cable")
+    if cable is None or not update_cable(cable, control_points, segment_codes):
+        # a segment whose type was cleared in the table is left out of the
+        # profile, as Cable2D() does
+        cable = Cable2D.from_arrays(
+            control_points[:, 0],
+            control_points[:, 1],
+            segment_codes,
+            incremental=True,
+            allow_unknown=True,
+        )
+    with metrics.timer("profile"):
+        coordinates = cable.profile(interval)
+    if state is None:
+        with _last_cable_lock:
+            _last_cable = cable
+    else:
+        state["cable"] = cable
+    if symmetric:
+        with metrics.timer("mirror"):
+            coordinates = mirror_profile(coordinates)
     return coordinates
 
 
-@callback(
+def update_cable(cable, control_points, segment_codes):
+    # apply the differences to an incremental cable, return False if it is
+    # cheaper (or only possible) to build a new one
+    if cable.control_points.shape != control_points.shape:
+        return False
+    changed_points = np.flatnonzero((cable.control_points != control_points).any(axis=1))
+    changed_types = np.flatnonzero(cable.segment_codes != segment_codes)
+    if len(changed_points) + len(changed_types) > max_incremental_edits:
+        return False
+    if (segment_codes < 0).any():
+        return False
+    for i in changed_types:
+        cable.set_segment_type(i, SEGMENT_TYPE_NAMES[int(segment_codes[i])])
+    for i in changed_points:
+        cable.update_control_point(i, *control_points[i])
+    return True
+
+
+# the table bookkeeping runs in the browser (assets/table.js), so that each
+# edit reaches the server once, as a consistent table
+app.clientside_callback(
+    ClientsideFunction(namespace="cableprofile", function_name="update_table"),
     Output("segments_table", "data"),
     Input("segments_table", "data_timestamp"),
     State("segments_table", "data"),
     prevent_initial_call=True,
 )
-def update_table(timestamp, rows):
-    rows = update_sl_no(rows)
-    rows = update_segment_ends(rows)
-    return rows
 
-
-@callback(
+app.clientside_callback(
+    ClientsideFunction(namespace="cableprofile", function_name="update_cable_end"),
     Output("segments_table", "data", allow_duplicate=True),
     Input("cable_end_x", "value"),
     Input("cable_end_y", "value"),
     State("segments_table", "data"),
     prevent_initial_call=True,
 )
-def update_cable_end(cable_end_x, cable_end_y, rows):
-    rows[-1]["segment_end_x"] = cable_end_x
-    rows[-1]["segment_end_y"] = cable_end_y
-    return rows
-
 
-@callback(
+app.clientside_callback(
+    ClientsideFunction(namespace="cableprofile", function_name="add_row"),
     Output("segments_table", "data", allow_duplicate=True),
     Input("add_row_button", "n_clicks"),
     State("segments_table", "data"),
@@ -322,80 +705,276 @@ def update_cable_end(cable_end_x, cable_end_y, rows):
     State("cable_end_y", "value"),
     prevent_initial_call=True,
 )
-def add_row(n_clicks, rows, columns, cable_end_x, cable_end_y):
-    if n_clicks > 0:
-        if len(rows) == 0:
-            rows.append(
-                {
-                    "sl-no": 1,
-                    "segment_type": "straight",
-                    "segment_start_x": 0,
-                    "segment_start_y": 0,
-                    "segment_end_x": cable_end_x,
-                    "segment_end_y": cable_end_y,
-                }
-            )
-        else:
-            rows.append(
-                {
-                    "sl-no": rows[-1]["sl-no"] + 1,
-                    "segment_type": "straight",
-                    # set new segment x as the midpoint of the previous segment
-                    "segment_start_x": (
-                        rows[-1]["segment_start_x"] + rows[-1]["segment_end_x"]
-                    )
-                    / 2,
-                    # set new segment y as the midpoint of the previous segment
-                    "segment_start_y": (
-                        rows[-1]["segment_start_y"] + rows[-1]["segment_end_y"]
-                    )
-                    / 2,
-                    "segment_end_x": cable_end_x,
-                    "segment_end_y": cable_end_y,
-                }
-            )
-        update_segment_ends(rows)
-    return rows
-
-
-def update_sl_no(rows):
-    for i in range(0, len(rows)):
-        rows[i]["sl-no"] = i + 1
-    return rows
 
+if session_store is not None:
+    app.clientside_callback(
+        ClientsideFunction(namespace="cableprofile", function_name="table_diff"),
+        Output("table_diff", "data"),
+        Input("segments_table", "data"),
+    )
+    callback(
+        Output("cable2d_profile_graph", "figure", allow_duplicate=True),
+        Output("background_profile", "data", allow_duplicate=True),
+        Output("figure_key", "data", allow_duplicate=True),
+        Input("session_status", "data"),
+        State("segments_table", "data"),
+        State("table_diff", "data"),
+        State("interval", "value"),
+        State("symmetric_switch", "on"),
+        State("figure_key", "data"),
+        prevent_initial_call=True,
+    )(resync_session)
+
+app.clientside_callback(
+    ClientsideFunction(namespace="cableprofile", function_name="clear_table"),
+    Output("segments_table", "data", allow_duplicate=True),
+    Input("clear_button", "n_clicks"),
+    prevent_initial_call=True,
+)
 
-def update_segment_ends(rows):
-    # update the segment_end_x and segment_end_y columns based on the segment_start_x and segment_start_y columns of the previous row
-    for i in range(0, len(rows) - 1):
-        rows[i]["segment_end_x"] = rows[i + 1]["segment_start_x"]
-        rows[i]["segment_end_y"] = rows[i + 1]["segment_start_y"]
-    return rows
+app.clientside_callback(
+    ClientsideFunction(namespace="cableprofile", function_name="download_csv"),
+    Output("download_request", "value"),
+    Input("csv_download", "data"),
+    prevent_initial_call=True,
+)
 
 
 @callback(
     Output("download-dataframe-csv", "data"),
+    Output("background_download", "data"),
+    Output("csv_download", "data"),
     Input("btn_csv", "n_clicks"),
     State("filename", "value"),
     State("segments_table", "data"),
     State("interval", "value"),
     State("symmetric_switch", "on"),
+    State("download_dtype", "value"),
     prevent_initial_call=True,
 )
-def save_profile(n_clicks, filename, rows, interval, symmetric):
-    profile_df = get_profile(rows, interval, symmetric)
-    return dcc.send_data_frame(profile_df.to_csv, filename)
+def save_profile(n_clicks, filename, rows, interval, symmetric, dtype="float64"):
+    request = {
+        "filename": filename,
+        "rows": rows,
+        "interval": interval,
+        "symmetric": symmetric,
+        "dtype": dtype,
+    }
+    if in_background(rows, interval, symmetric):
+        # left to save_profile_background
+        return no_update, request, no_update
+    if download_format(filename) == "csv":
+        # posted to download_profile_csv by the download_csv clientside callback
+        return no_update, no_update, request
+    return profile_download(filename, rows, interval, symmetric, dtype), no_update, no_update
+
+
+def save_profile_background(set_progress, request):
+    # the binary formats are sent by the callback, and a csv file is written
+    # to the job cache for the browser to fetch from download_profile_file
+    if download_format(request["filename"]) == "csv":
+        return no_update, {"url": write_profile_file(set_progress, **request)}
+    return profile_download(**request, set_progress=set_progress), no_update
+
+
+def download_format(filename):
+    # the file extension picks the format: npy, parquet, npz or else csv
+    fmt = os.path.splitext(filename or "")[1].lstrip(".").lower()
+    return fmt if fmt in formats else "csv"
+
+
+def profile_download(filename, rows, interval, symmetric, dtype, set_progress=None):
+    # the binary formats need the whole profile in memory
+    fmt = download_format(filename)
+    if set_progress is None:
+        coordinates = get_profile(rows, interval, symmetric).to_numpy()
+    else:
+        coordinates = profile_cache.get_or_compute(
+            profile_key(rows, interval, symmetric),
+            lambda: compute_profile(
+                *get_cable_arrays(rows), interval, symmetric, set_progress
+            ),
+        )
+    return dcc.send_bytes(
+        lambda f: save_profile_file(f, coordinates, fmt=fmt, dtype=dtype),
+        filename,
+    )
 
 
-@callback(
-    Output("segments_table", "data", allow_duplicate=True),
-    Input("clear_button", "n_clicks"),
-    prevent_initial_call=True,
-)
-def clear_table_data(n_clicks):
-    if n_clicks == 0:
-        raise exceptions.PreventUpdate()
-    data = pd.DataFrame().to_dict("records")  # empty dataframe
-    return data
+@server.route("/download/profile", methods=["POST"])
+def download_profile_csv():
+    # the csv download, streamed to the browser as it is written, so that a
+    # large profile is never held in memory as a whole file
+    download = json.loads(request.form["request"])
+    filename = download.get("filename") or default_filename
+    return Response(
+        iter_profile_csv(
+            download["rows"],
+            download["interval"],
+            download["symmetric"],
+            download.get("dtype"),
+        ),
+        mimetype="text/csv",
+        headers={
+            "Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"
+        },
+    )
+
+
+@server.route("/download/profile/<token>")
+def download_profile_file(token):
+    # a csv file written by a background job, sent from disk
+    if not re.fullmatch("[0-9a-f]{32}", token):
+        abort(404)
+    path = os.path.join(download_directory(), f"{token}.csv")
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        abort(404)
+    # each file is downloaded once; the open file outlives its name
+    os.remove(path)
+    filename = request.args.get("filename") or default_filename
+    return send_file(f, mimetype="text/csv", as_attachment=True, download_name=filename)
+
+
+def iter_profile_csv(rows, interval, symmetric, dtype=None, chunk_size=csv_chunk_size):
+    # the profile as csv text a chunk at a time, in the same format as
+    # DataFrame.to_csv
+    return iter_csv(
+        profile_chunks(rows, interval, symmetric, chunk_size)[0], dtype=dtype, index=True
+    )
+
+
+def write_profile_file(
+    set_progress, filename, rows, interval, symmetric, dtype, chunk_size=csv_chunk_size
+):
+    # write the csv file of a download in the background, reporting the number
+    # of points written, and return the url it is sent from
+    directory = download_directory()
+    os.makedirs(directory, exist_ok=True)
+    remove_old_downloads(directory)
+    chunks, total = profile_chunks(rows, interval, symmetric, chunk_size)
+
+    def reported(chunks):
+        n_points = 0
+        for chunk in chunks:
+            yield chunk
+            n_points += len(chunk)
+            set_progress((str(n_points), str(total)))
+
+    token = uuid.uuid4().hex
+    path = os.path.join(directory, f"{token}.csv")
+    with open(f"{path}.tmp", "w", newline="") as f:
+        write_csv(f, reported(chunks), dtype=dtype, index=True)
+    os.replace(f"{path}.tmp", path)
+    return app.get_relative_path(f"/download/profile/{token}?filename={quote(filename)}")
+
+
+def download_directory():
+    # shared by the background jobs and the web workers
+    return os.path.join(background_manager.handle.directory, "downloads")
+
+
+def remove_old_downloads(directory):
+    # files never fetched, or left by cancelled jobs
+    expired = time.time() - download_ttl
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < expired:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def profile_chunks(rows, interval, symmetric, chunk_size):
+    # the profile a chunk at a time, and its number of points
+    if not rows:
+        return iter([]), 0
+    coordinates = profile_cache.get(profile_key(rows, interval, symmetric))
+    if coordinates is not None:
+        # the profile that was just plotted
+        chunks = (
+            coordinates[i : i + chunk_size]
+            for i in range(0, len(coordinates), chunk_size)
+        )
+        return chunks, len(coordinates)
+    control_points, segment_codes = get_cable_arrays(rows)
+    cable = Cable2D.from_arrays(
+        control_points[:, 0], control_points[:, 1], segment_codes, allow_unknown=True
+    )
+    total = cable.point_count(interval)
+    if symmetric:
+        total = 2 * total - 1
+    return iter_profile_chunks(cable, interval, symmetric, chunk_size), total
+
+
+if background_manager is not None:
+    # cancelled when the inputs change, the new inputs starting a new job
+    callback(
+        Output("cable2d_profile_graph", "figure", allow_duplicate=True),
+        Output("figure_key", "data", allow_duplicate=True),
+        Input("background_profile", "data"),
+        background=True,
+        manager=background_manager,
+        progress=[
+            Output("profile_progress", "value"),
+            Output("profile_progress", "max"),
+        ],
+        running=[
+            (
+                Output("profile_progress", "style"),
+                {"visibility": "visible"},
+                {"visibility": "hidden"},
+            )
+        ],
+        cancel=profile_inputs,
+        prevent_initial_call=True,
+    )(plot_cable_profile_background)
+    callback(
+        Output("download-dataframe-csv", "data", allow_duplicate=True),
+        Output("csv_download", "data", allow_duplicate=True),
+        Input("background_download", "data"),
+        background=True,
+        manager=background_manager,
+        progress=[
+            Output("download_progress", "value"),
+            Output("download_progress", "max"),
+        ],
+        running=[
+            (
+                Output("download_progress", "style"),
+                {"visibility": "visible"},
+                {"visibility": "hidden"},
+            ),
+            (Output("btn_csv", "disabled"), True, False),
+        ],
+        cancel=profile_inputs,
+        prevent_initial_call=True,
+    )(save_profile_background)
+
+
+@server.before_request
+def start_request_timer():
+    if metrics.enabled:
+        g.request_start = time.perf_counter()
+
+
+@server.after_request
+def observe_request_time(response):
+    # covers the whole callback, including Dash's serialization of the figure
+    start = g.pop("request_start", None)
+    if start is not None:
+        # labelled by route, e.g. /assets/<path:path>, so that the number of
+        # series stays bounded whatever paths are requested
+        rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        metrics.observe("request", time.perf_counter() - start, path=rule)
+    return response
+
+
+@server.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,136 @@
+// Bookkeeping of the segments table, run in the browser by clientside
+// callbacks so that only the final, consistent table reaches the server, and
+// the start of csv downloads.
+(function () {
+    // with server-side sessions: the id of this page's session, and the rows
+    // last sent to the server and their version
+    const session = Array.from(
+        window.crypto.getRandomValues(new Uint8Array(16)),
+        function (byte) {
+            return byte.toString(16).padStart(2, "0");
+        }
+    ).join("");
+    let synced = null;
+    let version = 0;
+
+    function update_sl_no(rows) {
+        return rows.map(function (row, i) {
+            return Object.assign({}, row, {"sl-no": i + 1});
+        });
+    }
+
+    function update_segment_ends(rows) {
+        // each segment ends where the next one starts
+        return rows.map(function (row, i) {
+            if (i === rows.length - 1) {
+                return row;
+            }
+            return Object.assign({}, row, {
+                segment_end_x: rows[i + 1].segment_start_x,
+                segment_end_y: rows[i + 1].segment_start_y,
+            });
+        });
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        cableprofile: {
+            update_table: function (timestamp, rows) {
+                return update_segment_ends(update_sl_no(rows));
+            },
+
+            update_cable_end: function (cable_end_x, cable_end_y, rows) {
+                if (!rows || rows.length === 0) {
+                    return window.dash_clientside.no_update;
+                }
+                rows = rows.slice();
+                rows[rows.length - 1] = Object.assign({}, rows[rows.length - 1], {
+                    segment_end_x: cable_end_x,
+                    segment_end_y: cable_end_y,
+                });
+                return rows;
+            },
+
+            add_row: function (n_clicks, rows, columns, cable_end_x, cable_end_y) {
+                if (!(n_clicks > 0)) {
+                    return window.dash_clientside.no_update;
+                }
+                rows = (rows || []).slice();
+                if (rows.length === 0) {
+                    rows.push({
+                        "sl-no": 1,
+                        segment_type: "straight",
+                        segment_start_x: 0,
+                        segment_start_y: 0,
+                        segment_end_x: cable_end_x,
+                        segment_end_y: cable_end_y,
+                    });
+                } else {
+                    const last = rows[rows.length - 1];
+                    rows.push({
+                        "sl-no": last["sl-no"] + 1,
+                        segment_type: "straight",
+                        // the new segment starts at the midpoint of the previous one
+                        segment_start_x: (last.segment_start_x + last.segment_end_x) / 2,
+                        segment_start_y: (last.segment_start_y + last.segment_end_y) / 2,
+                        segment_end_x: cable_end_x,
+                        segment_end_y: cable_end_y,
+                    });
+                }
+                return update_segment_ends(rows);
+            },
+
+            table_diff: function (rows) {
+                // the rows changed since the last call, or the whole table
+                // at the start of the session
+                rows = rows || [];
+                if (synced === null) {
+                    synced = rows;
+                    version += 1;
+                    return {session: session, version: version, rows: rows};
+                }
+                const changes = {};
+                rows.forEach(function (row, i) {
+                    if (i >= synced.length || JSON.stringify(row) !== JSON.stringify(synced[i])) {
+                        changes[i] = row;
+                    }
+                });
+                if (rows.length === synced.length && Object.keys(changes).length === 0) {
+                    return window.dash_clientside.no_update;
+                }
+                synced = rows;
+                version += 1;
+                return {
+                    session: session,
+                    version: version,
+                    base: version - 1,
+                    n_rows: rows.length,
+                    changes: changes,
+                };
+            },
+
+            clear_table: function (n_clicks) {
+                if (!n_clicks) {
+                    return window.dash_clientside.no_update;
+                }
+                return [];
+            },
+
+            download_csv: function (download) {
+                // csv files are sent by the server: either fetch the file a
+                // background job wrote, or post the table from the hidden
+                // download form to have the profile streamed
+                if (!download) {
+                    return window.dash_clientside.no_update;
+                }
+                if (download.url) {
+                    window.location.assign(download.url);
+                    return window.dash_clientside.no_update;
+                }
+                const form = document.getElementById("download_form");
+                form.elements.request.value = JSON.stringify(download);
+                form.submit();
+                return window.dash_clientside.no_update;
+            },
+        },
+    });
+})();
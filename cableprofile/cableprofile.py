@@ -2,112 +2,421 @@ from typing import List, Tuple
 
 import numpy as np
 
+from cableprofile import metrics
+from cableprofile.export import save_container, save_profile
 
-class CableSegment:
-    def __init__(self, p1: Tuple[float, float], p2: Tuple[float, float]) -> None:
-        self.p1 = p1
-        self.p2 = p2
+STRAIGHT = 0
+PARABOLIC = 1
+REVERSE_CURVE = 2
 
-    def get_coordinates(self, interval):
-        NotImplementedError
+# the registered segment types, see register_segment_type
+SEGMENT_TYPE_CODES = {}
+SEGMENT_TYPE_NAMES = {}
+_SEGMENT_CLASSES = {}
+# vectorized y(x) kernels, keyed by segment type code
+_SEGMENT_KERNELS = {}
+# vectorized adaptive point count kernels, keyed by segment type code
+_ADAPTIVE_COUNT_KERNELS = {}
+# vectorized polynomial coefficient kernels, keyed by segment type code
+_COEFFICIENT_KERNELS = {}
 
 
-class Straight(CableSegment):
-    def __init__(self, p1: Tuple[float, float], p2: Tuple[float, float]) -> None:
-        super().__init__(p1, p2)
+def register_segment_type(
+    name, code, segment_class, kernel, adaptive_count, coefficients
+):
+    """Add a segment type.
 
-    def __repr__(self) -> str:
-        return f"Straight({self.p1}, {self.p2})"
+    Every kernel works on arrays, one element per point or segment, so that
+    all segments of one type are evaluated in a single call.
 
-    def get_coordinates(self, interval):
-        """Return a list of coordinates between two points.
+    Args:
+        name (str): The name used in segment type lists, e.g. "parabolic".
+        code (int): The type code stored in the segment code arrays, 0 to 127.
+        segment_class (type): The CableSegment subclass for this type.
+        kernel (callable): ``kernel(x, x1, y1, x2, y2)`` returning the y
+            coordinates at x of segments from (x1, y1) to (x2, y2).
+        adaptive_count (callable): ``adaptive_count(dx, dy, tolerance)``
+            returning the number of points keeping the chords of segments
+            with the given extents within tolerance of the curve.
+        coefficients (callable): ``coefficients(x1, y1, x2, y2)`` returning
+            the (n, 2, 3) coefficients of the quadratics on the two halves of
+            each segment, see Cable2D.polynomial.
+    """
+    if not 0 <= code <= 127:
+        raise ValueError("Segment type codes should be between 0 and 127.")
+    if code in SEGMENT_TYPE_NAMES and SEGMENT_TYPE_NAMES[code] != name:
+        raise ValueError(
+            f"Code {code} is already used by {SEGMENT_TYPE_NAMES[code]!r}."
+        )
+    SEGMENT_TYPE_CODES[name] = code
+    SEGMENT_TYPE_NAMES[code] = name
+    _SEGMENT_CLASSES[code] = segment_class
+    _SEGMENT_KERNELS[code] = kernel
+    _ADAPTIVE_COUNT_KERNELS[code] = adaptive_count
+    _COEFFICIENT_KERNELS[code] = coefficients
+    segment_class.code = code
 
-        Args:
-            p1 (tuple): The first point.
-            p2 (tuple): The second point.
-            interval (int): The interval between each point.
 
-        Returns:
-            list: A list of coordinates between p1 and p2.
-        """
-        x1, y1 = self.p1
-        x2, y2 = self.p2
-        dx = x2 - x1
-        dy = y2 - y1
-        x_coords = np.linspace(x1, x2, int(dx / interval), endpoint=False)
-        slope = dy / dx
-        intercept = y1 - slope * x1
-        y_coords = slope * x_coords + intercept
-        coordinates = np.column_stack((x_coords, y_coords))
-        return coordinates
+def segment_type_codes(segment_types):
+    """Return the type codes of segment types given as names or codes.
 
+    Each distinct name is looked up once, so long schedules are converted
+    without a Python loop over the segments. Unknown types get the code -1,
+    as do codes that are not the integer code of a registered type.
 
-class Parabolic(CableSegment):
-    def __init__(self, p1: Tuple[float, float], p2: Tuple[float, float]) -> None:
-        super().__init__(p1, p2)
+    Args:
+        segment_types (array_like): Segment type names, or codes as integers
+            or floats.
 
-    def __repr__(self) -> str:
-        return f"Parabolic({self.p1}, {self.p2})"
+    Returns:
+        numpy.ndarray: The int8 type codes.
+    """
+    segment_types = np.asarray(segment_types)
+    if segment_types.dtype.kind in "iuf":
+        # checked before casting, so that e.g. 256 or 0.5 is not taken for 0;
+        # float codes come e.g. from a pandas column holding nan
+        known = np.isin(segment_types, list(SEGMENT_TYPE_NAMES))
+        codes = np.full(segment_types.shape, -1, dtype=np.int8)
+        codes[known] = segment_types[known].astype(np.int8)
+        return codes
+    if not segment_types.size:
+        return np.empty(0, dtype=np.int8)
+    names, inverse = np.unique(segment_types.astype(str), return_inverse=True)
+    lookup = np.array([SEGMENT_TYPE_CODES.get(n, -1) for n in names], dtype=np.int8)
+    return lookup[inverse.reshape(-1)]
 
-    def get_coordinates(self, interval):
-        """Return a list of coordinates between two points.
 
-        Args:
-            p1 (tuple): The first point.
-            p2 (tuple): The second point.
-            interval (int): The interval between each point.
+def _straight_y(x, x1, y1, x2, y2):
+    """Return the y coordinates of a straight line through (x1, y1) and (x2, y2)."""
+    slope = (y2 - y1) / (x2 - x1)
+    intercept = y1 - slope * x1
+    return slope * x + intercept
 
-        Returns:
-            list: A list of coordinates between p1 and p2.
-        """
-
-        x1, y1 = self.p1
-        x2, y2 = self.p2
-        dx = x2 - x1
-        dy = y2 - y1
-        x_coords = np.linspace(x1, x2, int(dx / interval), endpoint=False)
-        if dy > 0:
-            y_coords = y1 + (x_coords - x1) ** 2 * dy / dx**2
-        else:
-            y_coords = y2 - (x_coords - x2) ** 2 * dy / dx**2
-        coordinates = np.column_stack((x_coords, y_coords))
-        return coordinates
 
+def _parabolic_y(x, x1, y1, x2, y2):
+    """Return the y coordinates of a parabola with its vertex at the lower end."""
+    dx = x2 - x1
+    dy = y2 - y1
+    return np.where(
+        dy > 0,
+        y1 + (x - x1) ** 2 * dy / dx**2,
+        y2 - (x - x2) ** 2 * dy / dx**2,
+    )
+
+
+def _reverse_curve_y(x, x1, y1, x2, y2):
+    """Return the y coordinates of two parabolas meeting at the segment midpoint."""
+    xm, ym = (x1 + x2) / 2, (y1 + y2) / 2
+    return np.where(
+        x <= xm,
+        y1 + (ym - y1) / (xm - x1) ** 2 * (x - x1) ** 2,
+        y2 - (y2 - ym) / (x2 - xm) ** 2 * (x2 - x) ** 2,
+    )
+
+
+# A chord of length h on a curve with second derivative y'' deviates from it
+# by at most |y''| h^2 / 8; the adaptive counts are the smallest counts whose
+# spacing satisfies that bound.
+
+
+def _straight_count(dx, dy, tolerance):
+    # the chord is the segment itself
+    return np.where(dx > 0, 1, 0).astype(np.intp)
+
+
+def _parabolic_count(dx, dy, tolerance):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        curvature = 2 * np.abs(dy) / dx**2
+        count = np.ceil(dx * np.sqrt(curvature / (8 * tolerance)))
+    return np.where(dx > 0, np.maximum(count, 1), 0).astype(np.intp)
+
+
+def _reverse_curve_count(dx, dy, tolerance):
+    # an even count puts a point on the inflection at the midpoint
+    half = dx / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        curvature = np.abs(dy) / half**2
+        count = np.ceil(half * np.sqrt(curvature / (8 * tolerance)))
+    return np.where(half > 0, 2 * np.maximum(count, 1), 0).astype(np.intp)
+
+
+def _halves(x1, x2, c0, c1, c2):
+    """Return the (n, 2, 3) coefficients of one quadratic starting at x1 on
+    both halves of [x1, x2]."""
+    h = (x2 - x1) / 2
+    coefficients = np.empty((len(x1), 2, 3))
+    coefficients[:, 0, 0] = c0
+    coefficients[:, 0, 1] = c1
+    coefficients[:, 0, 2] = c2
+    coefficients[:, 1, 0] = c0 + c1 * h + c2 * h**2
+    coefficients[:, 1, 1] = c1 + 2 * c2 * h
+    coefficients[:, 1, 2] = c2
+    return coefficients
+
+
+def _straight_coefficients(x1, y1, x2, y2):
+    slope = (y2 - y1) / (x2 - x1)
+    return _halves(x1, x2, y1, slope, 0.0)
+
+
+def _parabolic_coefficients(x1, y1, x2, y2):
+    dx = x2 - x1
+    dy = y2 - y1
+    k = dy / dx**2
+    # the vertex is at x1 when rising, at x2 when falling
+    rising = dy > 0
+    return _halves(
+        x1, x2, y1, np.where(rising, 0.0, 2 * dy / dx), np.where(rising, k, -k)
+    )
+
+
+def _reverse_curve_coefficients(x1, y1, x2, y2):
+    xm, ym = (x1 + x2) / 2, (y1 + y2) / 2
+    a = (ym - y1) / (xm - x1) ** 2
+    b = (y2 - ym) / (x2 - xm) ** 2
+    coefficients = np.empty((len(x1), 2, 3))
+    coefficients[:, 0, 0] = y1
+    coefficients[:, 0, 1] = 0.0
+    coefficients[:, 0, 2] = a
+    coefficients[:, 1, 0] = ym
+    coefficients[:, 1, 1] = 2 * b * (x2 - xm)
+    coefficients[:, 1, 2] = -b
+    return coefficients
+
+
+def _coefficients(x1, y1, x2, y2, codes):
+    """Return the (n, 2, 3) polynomial coefficients of the two halves of each
+    segment, nan for unknown types; see Cable2D.polynomial."""
+    coefficients = np.full((len(codes), 2, 3), np.nan)
+    for code, kernel in _COEFFICIENT_KERNELS.items():
+        mask = codes == code
+        if mask.any():
+            # zero-length segments get infinite or nan coefficients
+            with np.errstate(divide="ignore", invalid="ignore"):
+                coefficients[mask] = kernel(x1[mask], y1[mask], x2[mask], y2[mask])
+    return coefficients
+
+
+def _arc_length(c1, c2, t, g=1.0):
+    """Return the length of y = c0 + c1 s + c2 s**2 from s = 0 to s = t.
+
+    More generally, return the integral of sqrt(g + (c1 + 2 c2 s)**2) from
+    s = 0 to s = t, the length of a curve whose slope has a constant
+    component perpendicular to c1 + 2 c2 s, with g = 1 + its square.
+    """
+    u0 = c1
+    u1 = c1 + 2 * c2 * t
+
+    def antiderivative(u):
+        return (u * np.sqrt(g + u * u) + g * np.arcsinh(u / np.sqrt(g))) / 2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exact = (antiderivative(u1) - antiderivative(u0)) / (2 * c2)
+    # on (nearly) straight pieces the slope is (nearly) constant
+    um = (u0 + u1) / 2
+    return np.where(np.abs(u1 - u0) < 1e-6, t * np.sqrt(g + um * um), exact)
+
+
+def _arc_length_3d(c1y, c2y, c1z, c2z, t):
+    """Return the length from s = 0 to s = t of the curve with elevation
+    c0y + c1y s + c2y s**2 and plan offset c0z + c1z s + c2z s**2."""
+    c2 = np.hypot(c2y, c2z)
+    # the slope vector (c1y, c1z) + 2 (c2y, c2z) s changes along a fixed
+    # direction e; its component across e is constant
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ey = np.where(c2 > 0, c2y / c2, 1.0)
+        ez = np.where(c2 > 0, c2z / c2, 0.0)
+    across = c1y * ez - c1z * ey
+    return _arc_length(c1y * ey + c1z * ez, c2, t, 1 + across * across)
+
+
+def _tangent_angle(y0, z0, y1, z1):
+    """Return the angle between the tangents (1, y0, z0) and (1, y1, z1)."""
+    cross = np.sqrt((y0 * z1 - z0 * y1) ** 2 + (z1 - z0) ** 2 + (y0 - y1) ** 2)
+    return np.arctan2(cross, 1 + y0 * y1 + z0 * z1)
+
+
+def _evaluate_segments(x, segment, codes, x1, y1, x2, y2, out):
+    """Write y(x) into out for points lying on the given segments.
+
+    The points are grouped by segment type so that each kernel runs once over
+    all of its points; points with an unknown code are left untouched.
+    """
+    for code, kernel in _SEGMENT_KERNELS.items():
+        mask = codes == code
+        if mask.any():
+            s = segment[mask]
+            with metrics.timer("segment", segment_type=_SEGMENT_CLASSES[code].__name__):
+                out[mask] = kernel(x[mask], x1[s], y1[s], x2[s], y2[s])
+    return out
+
+
+def _point_counts(x1, y1, x2, y2, codes, interval=None, tolerance=None):
+    """Return the number of points of each segment, as an array.
+
+    See Cable2D.profile for interval and tolerance; exactly one is given.
+    Segments of unknown type or running backwards get no points.
+    """
+    if (interval is None) == (tolerance is None):
+        raise ValueError("Give exactly one of interval and tolerance.")
+    dx = x2 - x1
+    if tolerance is None:
+        counts = (dx / interval).astype(np.intp)
+    else:
+        if tolerance <= 0:
+            raise ValueError("tolerance should be positive.")
+        counts = np.zeros(len(codes), dtype=np.intp)
+        for code, adaptive_count in _ADAPTIVE_COUNT_KERNELS.items():
+            mask = codes == code
+            if mask.any():
+                counts[mask] = adaptive_count(dx[mask], y2[mask] - y1[mask], tolerance)
+    counts[(counts < 0) | (codes < 0)] = 0
+    return counts
+
+
+def _sample_segments(x1, y1, x2, y2, codes, counts, out):
+    """Write counts[i] evenly spaced points of each segment i into out.
+
+    The points of a segment are those of ``np.linspace(x1, x2, n,
+    endpoint=False)``; the segments follow each other in out, an
+    (sum(counts), 2) array.
+    """
+    segment = np.repeat(np.arange(len(counts)), counts)
+    starts = np.cumsum(counts) - counts
+    step = (x2 - x1) / np.maximum(counts, 1)
+    x = out[:, 0]
+    np.multiply(np.arange(len(segment)) - starts[segment], step[segment], out=x)
+    x += x1[segment]
+    _evaluate_segments(x, segment, codes[segment], x1, y1, x2, y2, out[:, 1])
+    return out
+
+
+class CableSegment:
+    """A cable segment from p1 to p2.
+
+    The segments of a Cable2D are not stored as objects: its segment_list
+    holds views of two rows of the cable's control point array.
+    """
+
+    __slots__ = ("_points",)
+    code = None
 
-class ReverseCurve(CableSegment):
     def __init__(self, p1: Tuple[float, float], p2: Tuple[float, float]) -> None:
-        super().__init__(p1, p2)
+        self._points = np.array((p1, p2), dtype=float)
+
+    @classmethod
+    def _view(cls, points):
+        """Return a segment sharing the given (2, 2) array of end points."""
+        segment = cls.__new__(cls)
+        segment._points = points
+        return segment
+
+    @property
+    def p1(self):
+        return tuple(self._points[0].tolist())
+
+    @property
+    def p2(self):
+        return tuple(self._points[1].tolist())
 
     def __repr__(self) -> str:
-        return f"ReverseCurve({self.p1}, {self.p2})"
+        return f"{type(self).__name__}({self.p1}, {self.p2})"
+
+    def _ends(self):
+        """Return x1, y1, x2, y2 and the code as one-element arrays."""
+        if self.code is None:
+            raise NotImplementedError
+        return (
+            self._points[:1, 0],
+            self._points[:1, 1],
+            self._points[1:, 0],
+            self._points[1:, 1],
+            np.array([self.code], dtype=np.int8),
+        )
+
+    def point_count(self, interval):
+        """Return the number of points get_coordinates returns for interval."""
+        return int(_point_counts(*self._ends(), interval=interval)[0])
 
-    def get_coordinates(self, interval):
+    def adaptive_point_count(self, tolerance):
+        """Return the number of evenly spaced points keeping the chords within
+        tolerance of the curve.
+
+        A chord of length h on a curve with second derivative y'' deviates
+        from it by at most |y''| h^2 / 8, so this is the smallest count whose
+        spacing satisfies that bound.
+        """
+        return int(_point_counts(*self._ends(), tolerance=tolerance)[0])
+
+    def get_coordinates(self, interval, out=None):
         """Return a list of coordinates between two points.
 
         Args:
-            p1 (tuple): The first point.
-            p2 (tuple): The second point.
-            interval (int): The interval between each point.
+            interval (float): The interval between each point.
+            out (numpy.ndarray, optional): An (n, 2) array to write the
+                coordinates into, n being ``point_count(interval)``.
 
         Returns:
-            list: A list of coordinates between p1 and p2.
-        """
-
-        x1, y1 = self.p1
-        x2, y2 = self.p2
-        dx = x2 - x1
-        xm, ym = (x1 + x2) / 2, (y1 + y2) / 2
-        x_coords = np.linspace(x1, x2, int(dx / interval), endpoint=False)
-        y_coords = np.piecewise(
-            x_coords,
-            [x_coords <= xm, x_coords > xm],
-            [
-                lambda x: y1 + (ym - y1) / (xm - x1) ** 2 * (x - x1) ** 2,
-                lambda x: y2 - (y2 - ym) / (x2 - xm) ** 2 * (x2 - x) ** 2,
-            ],
-        )
-        coordinates = np.column_stack((x_coords, y_coords))
-        return coordinates
+            numpy.ndarray: An (n, 2) array of coordinates from p1 up to, but
+            not including, p2.
+        """
+        return self.sample(self.point_count(interval), out=out)
+
+    def sample(self, n, out=None):
+        """Return n evenly spaced coordinates from p1 up to, but not including, p2.
+
+        Args:
+            n (int): The number of points.
+            out (numpy.ndarray, optional): An (n, 2) array to write the
+                coordinates into.
+
+        Returns:
+            numpy.ndarray: An (n, 2) array of coordinates.
+        """
+        ends = self._ends()
+        if out is None:
+            out = np.empty((n, 2))
+        elif out.shape != (n, 2):
+            raise ValueError(f"out should have shape {(n, 2)}, got {out.shape}.")
+        return _sample_segments(*ends, np.array([n], dtype=np.intp), out)
+
+
+class Straight(CableSegment):
+    __slots__ = ()
+
+
+class Parabolic(CableSegment):
+    __slots__ = ()
+
+
+class ReverseCurve(CableSegment):
+    __slots__ = ()
+
+
+register_segment_type(
+    "straight",
+    STRAIGHT,
+    Straight,
+    _straight_y,
+    _straight_count,
+    _straight_coefficients,
+)
+register_segment_type(
+    "parabolic",
+    PARABOLIC,
+    Parabolic,
+    _parabolic_y,
+    _parabolic_count,
+    _parabolic_coefficients,
+)
+register_segment_type(
+    "reverse_curve",
+    REVERSE_CURVE,
+    ReverseCurve,
+    _reverse_curve_y,
+    _reverse_curve_count,
+    _reverse_curve_coefficients,
+)
 
 
 class Cable2D:
@@ -115,9 +424,8 @@ class Cable2D:
         self,
         control_points: List[Tuple[(float, float)]],
         segment_type_list: List[str],
+        incremental: bool = False,
     ):
-        self.control_points_list = control_points
-        self.segment_type_list = segment_type_list
         # check if the number of control points is one more than the number of segments
         try:
             assert len(control_points) == len(segment_type_list) + 1
@@ -125,38 +433,849 @@ class Cable2D:
             print(
                 "The number of control points should be one more than the number of segments."
             )
-        self.segment_list = self._create_segment_list()
+        self._set_arrays(
+            np.array(control_points, dtype=float).reshape(-1, 2),
+            segment_type_codes(segment_type_list),
+            incremental,
+        )
+
+    def _set_arrays(self, points, codes, incremental):
+        # the cable is kept as an (n + 1, 2) array of control points and an
+        # (n,) array of segment type codes
+        self._points = points
+        self._segment_codes = codes
+        # the CableSegment objects are only created when needed
+        self._segment_list = None
+        # in incremental mode the last profile is kept as (interval, counts, coordinates)
+        self.incremental = incremental
+        self._cache = None
+        # (breaks, coefficients, lengths, angles), see polynomial()
+        self._polynomial = None
+
+    def __getstate__(self):
+        # pickle the arrays only: the caches are rebuilt when needed, and the
+        # profile kept in incremental mode can be far larger than the cable
+        state = self.__dict__.copy()
+        state.update(_segment_list=None, _cache=None, _polynomial=None)
+        return state
+
+    @classmethod
+    def from_arrays(cls, x, y, segment_types, incremental=False, allow_unknown=False):
+        """Return a cable from columns of control point coordinates.
+
+        Args:
+            x (array_like): The n + 1 control point x coordinates.
+            y (array_like): The n + 1 control point y coordinates.
+            segment_types (array_like): The n segment types, as names (e.g.
+                "parabolic") or type codes (e.g. PARABOLIC).
+            incremental (bool): See Cable2D.
+            allow_unknown (bool): Keep segments of unknown type (e.g. None),
+                which have no profile points, as Cable2D() does, instead of
+                raising ValueError.
+
+        Returns:
+            Cable2D: The cable, holding the given columns as arrays.
+        """
+        points = np.column_stack(
+            (np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        )
+        codes = segment_type_codes(segment_types)
+        if len(points) != len(codes) + 1:
+            raise ValueError(
+                "The number of control points should be one more than the number of segments."
+            )
+        if not allow_unknown and (codes < 0).any():
+            raise ValueError("Unknown segment type.")
+        cable = cls.__new__(cls)
+        cable._set_arrays(points, codes, incremental)
+        return cable
+
+    @classmethod
+    def from_dataframe(cls, table, incremental=False):
+        """Return a cable from a segments table, one row per segment.
+
+        Args:
+            table (pandas.DataFrame): A table with the segment_type,
+                segment_start_x, segment_start_y, segment_end_x and
+                segment_end_y columns of the app's segments table; the end of
+                each segment but the last is the start of the next one.
+            incremental (bool): See Cable2D.
+
+        Returns:
+            Cable2D: The cable.
+        """
+        x = table["segment_start_x"].to_numpy(dtype=float)
+        y = table["segment_start_y"].to_numpy(dtype=float)
+        if len(table):
+            x = np.append(x, float(table["segment_end_x"].iloc[-1]))
+            y = np.append(y, float(table["segment_end_y"].iloc[-1]))
+        return cls.from_arrays(x, y, table["segment_type"].to_numpy(), incremental)
+
+    @property
+    def control_points(self):
+        """The (n + 1, 2) control point coordinates, as a read-only array."""
+        points = self._points.view()
+        points.flags.writeable = False
+        return points
+
+    @property
+    def segment_codes(self):
+        """The (n,) segment type codes, as a read-only array."""
+        codes = self._segment_codes.view()
+        codes.flags.writeable = False
+        return codes
+
+    @property
+    def control_points_list(self):
+        """The control points, as a list of (x, y) tuples."""
+        return [tuple(p) for p in self._points.tolist()]
+
+    @property
+    def segment_type_list(self):
+        """The segment type names, None for unknown types."""
+        return [SEGMENT_TYPE_NAMES.get(c) for c in self._segment_codes.tolist()]
+
+    @property
+    def segment_list(self):
+        """The CableSegment objects, skipping segments of unknown type."""
+        if self._segment_list is None:
+            self._segment_list = self._create_segment_list()
+        return self._segment_list
+
+    def _create_segment(self, i):
+        """Return a CableSegment view of segment i, None for an unknown type."""
+        segment_class = _SEGMENT_CLASSES.get(int(self._segment_codes[i]))
+        if segment_class is not None:
+            return segment_class._view(self._points[i : i + 2])
+
+    def _segment_ends(self, start=0, stop=None):
+        """Return the x1, y1, x2, y2 arrays of segments start to stop."""
+        if stop is None:
+            stop = len(self._segment_codes)
+        points = self._points[start : stop + 1]
+        return points[:-1, 0], points[:-1, 1], points[1:, 0], points[1:, 1]
 
     def _create_segment_list(self):
         """Return a list of CableSegment objects."""
         segment_list = []
-        for i in range(len(self.segment_type_list)):
-            if self.segment_type_list[i] == "straight":
-                segment_list.append(
-                    Straight(
-                        self.control_points_list[i], self.control_points_list[i + 1]
-                    )
-                )
-            elif self.segment_type_list[i] == "parabolic":
-                segment_list.append(
-                    Parabolic(
-                        self.control_points_list[i], self.control_points_list[i + 1]
-                    )
-                )
-            elif self.segment_type_list[i] == "reverse_curve":
-                segment_list.append(
-                    ReverseCurve(
-                        self.control_points_list[i], self.control_points_list[i + 1]
-                    )
-                )
+        for i in range(len(self._segment_codes)):
+            segment = self._create_segment(i)
+            if segment is not None:
+                segment_list.append(segment)
         return segment_list
 
-    def profile(self, interval):
-        """Return a list of coordinates of the cable profile."""
-        coordinates = []
-        for segment in self.segment_list:
-            coordinates.append(segment.get_coordinates(interval))
-        coordinates = np.concatenate(coordinates)
+    def update_control_point(self, i, x, y):
+        """Move control point i to (x, y).
+
+        In incremental mode only the (at most two) segments meeting at the
+        point are re-evaluated and spliced into the cached profile.
+        """
+        # the segment views see the new point
+        self._points[i] = (x, y)
+        self._polynomial = None
+        segments = [j for j in (i - 1, i) if 0 <= j < len(self._segment_codes)]
+        self._update_cache(segments)
+
+    def set_segment_type(self, i, segment_type):
+        """Change the type of segment i, e.g. to "parabolic".
+
+        In incremental mode only segment i is re-evaluated and spliced into
+        the cached profile.
+        """
+        if segment_type not in SEGMENT_TYPE_CODES:
+            raise ValueError(f"Unknown segment type: {segment_type!r}.")
+        self._segment_codes[i] = SEGMENT_TYPE_CODES[segment_type]
+        self._polynomial = None
+        # rebuilt when next needed: the list skips segments of unknown type,
+        # so its indices are not the segment numbers
+        self._segment_list = None
+        self._update_cache([i])
+
+    def _update_cache(self, segments):
+        """Re-evaluate the given segments into the cached profile."""
+        if self._cache is None:
+            return
+        sampling, counts, coordinates = self._cache
+        first, last = min(segments), max(segments) + 1
+        ends = self._segment_ends(first, last)
+        codes = self._segment_codes[first:last]
+        new_counts = counts.copy()
+        new_counts[first:last] = _point_counts(*ends, codes, *sampling)
+        new_starts = np.concatenate(([0], np.cumsum(new_counts)))
+        if (new_counts != counts).any():
+            # the point counts changed: move the unaffected points around the
+            # edited segments into a buffer of the new size
+            starts = np.concatenate(([0], np.cumsum(counts)))
+            resized = np.empty((new_starts[-1] + 1, 2))
+            resized[: starts[first]] = coordinates[: starts[first]]
+            resized[new_starts[last] :] = coordinates[starts[last] :]
+            coordinates = resized
+        _sample_segments(
+            *ends,
+            codes,
+            new_counts[first:last],
+            coordinates[new_starts[first] : new_starts[last]],
+        )
+        coordinates[-1] = self._points[-1]
+        self._cache = (sampling, new_counts, coordinates)
+
+    def _point_counts(self, interval, tolerance):
+        """Return the number of points of each segment, as an array."""
+        return _point_counts(
+            *self._segment_ends(), self._segment_codes, interval, tolerance
+        )
+
+    def point_count(self, interval=None, tolerance=None):
+        """Return the number of points in the cable profile, see profile()."""
+        return int(self._point_counts(interval, tolerance).sum()) + 1
+
+    def profile(self, interval=None, out=None, tolerance=None):
+        """Return a list of coordinates of the cable profile.
+
+        Args:
+            interval (float): The interval between each point.
+            out (numpy.ndarray, optional): An (n, 2) array to write the
+                coordinates into, n being ``point_count(interval)``. Passing
+                the same array on every call avoids a new allocation.
+            tolerance (float, optional): Instead of an interval, space the
+                points of each segment so that the chords between them stay
+                within tolerance of the curve. Straight segments then only
+                get their end points.
+
+        Returns:
+            numpy.ndarray: An (n, 2) array of coordinates. In incremental mode
+            this is a copy of the cached profile.
+        """
+        sampling = (interval, tolerance)
+        if self.incremental:
+            if self._cache is None or self._cache[0] != sampling:
+                counts = self._point_counts(*sampling)
+                self._cache = (sampling, counts, self._profile(counts, None))
+            coordinates = self._cache[2]
+            if out is None:
+                return coordinates.copy()
+            elif out.shape != coordinates.shape:
+                raise ValueError(
+                    f"out should have shape {coordinates.shape}, got {out.shape}."
+                )
+            out[:] = coordinates
+            return out
+        counts = self._point_counts(*sampling)
+        return self._profile(counts, out)
+
+    def _profile(self, counts, out):
+        """Write the profile for the given per-segment point counts into out."""
+        n_points = int(counts.sum()) + 1
+        if out is None:
+            out = np.empty((n_points, 2))
+        elif out.shape != (n_points, 2):
+            raise ValueError(f"out should have shape {(n_points, 2)}, got {out.shape}.")
+        # all segments of one type are evaluated at once
+        _sample_segments(*self._segment_ends(), self._segment_codes, counts, out[:-1])
         # add cable endpoint to the coordinates
-        coordinates = np.vstack((coordinates, self.control_points_list[-1]))
+        out[-1] = self._points[-1]
+        return out
+
+    def iter_profile(self, interval, chunk_size=65536, reverse=False):
+        """Yield the coordinates of the cable profile in chunks.
+
+        Concatenating the chunks gives the same coordinates as
+        ``profile(interval)``, but only one chunk is held in memory at a time.
+
+        Args:
+            interval (float): The interval between each point.
+            chunk_size (int): The maximum number of points in each chunk.
+            reverse (bool): Yield the points from the cable end backwards.
+
+        Yields:
+            numpy.ndarray: An (n, 2) array of coordinates, n <= chunk_size.
+        """
+        if not len(self._segment_codes):
+            yield self._points[-1:].copy()
+            return
+        xs, ys = self._points[:, 0], self._points[:, 1]
+        dx = np.diff(xs)
+        counts = self._point_counts(interval, None)
+        segment_starts = np.concatenate(([0], np.cumsum(counts)))
+        step = dx / np.maximum(counts, 1)
+        # point n_points is the cable endpoint, the last point of the profile
+        n_points = segment_starts[-1]
+        starts = range(0, n_points + 1, chunk_size)
+        for start in reversed(starts) if reverse else starts:
+            index = np.arange(start, min(start + chunk_size, n_points + 1))
+            if reverse:
+                index = index[::-1]
+            segment = np.searchsorted(segment_starts, index, side="right") - 1
+            np.clip(segment, 0, len(counts) - 1, out=segment)
+            coordinates = np.empty((len(index), 2))
+            x = coordinates[:, 0]
+            np.multiply(index - segment_starts[segment], step[segment], out=x)
+            x += xs[segment]
+            _evaluate_segments(
+                x,
+                segment,
+                self._segment_codes[segment],
+                xs,
+                ys,
+                xs[1:],
+                ys[1:],
+                coordinates[:, 1],
+            )
+            coordinates[index == n_points] = self._points[-1]
+            yield coordinates
+
+    def save(self, path, interval, fmt=None, dtype=None):
+        """Write the cable profile to a csv, npy, parquet or npz file.
+
+        Args:
+            path (str or file): The file to write to.
+            interval (float): The interval between each point.
+            fmt (str, optional): The file format, taken from the file
+                extension by default.
+            dtype (optional): The dtype to store, e.g. ``numpy.float32``.
+        """
+        save_profile(path, self.profile(interval), fmt=fmt, dtype=dtype)
+
+    def evaluate(self, x):
+        """Return the y coordinates of the cable at the given stations.
+
+        Each station is located on its segment by a binary search over the
+        control point x coordinates, so no profile is generated.
+
+        Args:
+            x (array_like): The stations, in any order.
+
+        Returns:
+            numpy.ndarray: The y coordinates, with the shape of x. Stations
+            outside the cable are nan.
+        """
+        x = np.asarray(x, dtype=float)
+        xs, ys = self._points[:, 0], self._points[:, 1]
+        if not len(self._segment_codes):
+            # a single point, or none
+            y = np.full(x.shape, np.nan)
+            if len(xs):
+                y[x == xs[0]] = ys[0]
+            return y
+        segment = np.searchsorted(xs, x, side="right") - 1
+        np.clip(segment, 0, len(self._segment_codes) - 1, out=segment)
+        codes = np.where((x >= xs[0]) & (x <= xs[-1]), self._segment_codes[segment], -1)
+        y = np.full(x.shape, np.nan)
+        return _evaluate_segments(x, segment, codes, xs, ys, xs[1:], ys[1:], y)
+
+    def polynomial(self):
+        """Return the cable as piecewise quadratic polynomials.
+
+        Every segment is split at its midpoint, where a reverse curve changes
+        from one parabola to the other, so that each piece is one quadratic.
+        The result is kept until the cable is edited.
+
+        Returns:
+            tuple: ``(breaks, coefficients)``, read-only arrays of shape
+            (m + 1,) and (m, 3). On piece i, from ``breaks[i]`` to
+            ``breaks[i + 1]``, ``y = c0 + c1 * t + c2 * t**2`` with
+            ``t = x - breaks[i]`` and ``(c0, c1, c2) = coefficients[i]``.
+        """
+        return self._compile()[:2]
+
+    def _compile(self):
+        """Return the breaks, coefficients, and the cumulative length and
+        angle change at each break."""
+        if self._polynomial is not None:
+            return self._polynomial
+        x1, y1, x2, y2 = self._segment_ends()
+        coefficients = _coefficients(x1, y1, x2, y2, self._segment_codes)
+        starts = np.column_stack((x1, (x1 + x2) / 2)).ravel()
+        # zero-length pieces hold no station
+        keep = np.diff(np.append(starts, self._points[-1, 0])) > 0
+        breaks = np.append(starts[keep], self._points[-1, 0])
+        coefficients = coefficients.reshape(-1, 3)[keep]
+        _, c1, c2 = coefficients.T
+        widths = np.diff(breaks)
+        lengths = np.concatenate(([0.0], np.cumsum(_arc_length(c1, c2, widths))))
+        # the angle changes along each piece and, at a kink, between pieces
+        start_angles = np.arctan(c1)
+        end_angles = np.arctan(c1 + 2 * c2 * widths)
+        turns = np.abs(end_angles - start_angles)
+        turns[:-1] += np.abs(start_angles[1:] - end_angles[:-1])
+        angles = np.concatenate(([0.0], np.cumsum(turns)))
+        for array in (breaks, coefficients, lengths, angles):
+            array.flags.writeable = False
+        self._polynomial = (breaks, coefficients, lengths, angles)
+        return self._polynomial
+
+    def _locate(self, x):
+        """Return the piece, offset in the piece and coefficients of stations
+        x, and whether they lie on the cable."""
+        breaks, coefficients, _, _ = self._compile()
+        x = np.asarray(x, dtype=float)
+        if not len(coefficients):
+            coefficients = np.full((1, 3), np.nan)
+        piece = np.clip(
+            np.searchsorted(breaks, x, side="right") - 1, 0, len(coefficients) - 1
+        )
+        inside = (x >= breaks[0]) & (x <= breaks[-1])
+        t = np.where(inside, x - breaks[piece], np.nan)
+        return piece, t, coefficients[piece].T
+
+    def slope(self, x):
+        """Return the slope dy/dx of the cable at the given stations.
+
+        At a break between two pieces the slope of the piece starting there
+        is returned. Stations outside the cable are nan.
+        """
+        _, t, (_, c1, c2) = self._locate(x)
+        return c1 + 2 * c2 * t
+
+    def curvature(self, x):
+        """Return the signed curvature of the cable at the given stations.
+
+        The curvature is positive where the cable is concave upwards and its
+        inverse is the radius of curvature, in the units of the coordinates.
+        Stations outside the cable are nan.
+        """
+        _, t, (_, c1, c2) = self._locate(x)
+        return 2 * c2 / (1 + (c1 + 2 * c2 * t) ** 2) ** 1.5
+
+    def cumulative_length(self, x):
+        """Return the length of the cable from its start to the given stations."""
+        piece, t, (_, c1, c2) = self._locate(x)
+        lengths = self._compile()[2]
+        return lengths[piece] + _arc_length(c1, c2, t)
+
+    def cumulative_angle(self, x):
+        """Return the total angle change in radians from the start of the cable
+        to the given stations.
+
+        The angle of the tangent changes monotonically along each piece, so
+        this is the sum of the absolute changes along the pieces, plus those
+        at kinks between segments, as used for friction losses. A station at
+        a kink includes it.
+        """
+        piece, t, (_, c1, c2) = self._locate(x)
+        angles = self._compile()[3]
+        return angles[piece] + np.abs(np.arctan(c1 + 2 * c2 * t) - np.arctan(c1))
+
+    def length(self, x1=None, x2=None):
+        """Return the length of the cable between two stations.
+
+        Args:
+            x1 (array_like, optional): The first stations, the cable start by
+                default.
+            x2 (array_like, optional): The second stations, the cable end by
+                default.
+
+        Returns:
+            float or numpy.ndarray: The arc lengths, computed in closed form.
+        """
+        return self._between(self.cumulative_length, x1, x2)
+
+    def angle_change(self, x1=None, x2=None):
+        """Return the total angle change in radians between two stations.
+
+        Args:
+            x1 (array_like, optional): The first stations, the cable start by
+                default.
+            x2 (array_like, optional): The second stations, the cable end by
+                default.
+
+        Returns:
+            float or numpy.ndarray: The angle changes, see cumulative_angle.
+        """
+        return self._between(self.cumulative_angle, x1, x2)
+
+    def _between(self, cumulative, x1, x2):
+        x1 = self._points[0, 0] if x1 is None else x1
+        x2 = self._points[-1, 0] if x2 is None else x2
+        difference = np.abs(cumulative(x2) - cumulative(x1))
+        return difference[()] if np.ndim(difference) == 0 else difference
+
+
+class Cable3D:
+    """A cable following an elevation and a plan profile along one x axis.
+
+    Both profiles are Cable2D objects using the usual segment types. They are
+    combined on the union of their polynomial breaks (see Cable2D.polynomial),
+    where the slopes in both planes are linear, which gives the 3D length and
+    angle change in closed form. The methods match those of Cable2D, so a
+    Cable3D can be passed to ``losses.force_profile``.
+
+    Args:
+        elevation (Cable2D): The elevation y of the cable along x.
+        plan (Cable2D): The offset in plan z of the cable along x.
+    """
+
+    def __init__(self, elevation, plan):
+        self.elevation = elevation
+        self.plan = plan
+        # (elevation polynomial, plan polynomial, compiled union pieces)
+        self._compiled = None
+
+    def __repr__(self) -> str:
+        return f"Cable3D({self.start}, {self.end})"
+
+    @property
+    def start(self):
+        """The first station on both profiles."""
+        return max(self.elevation.control_points[0, 0], self.plan.control_points[0, 0])
+
+    @property
+    def end(self):
+        """The last station on both profiles."""
+        return min(
+            self.elevation.control_points[-1, 0], self.plan.control_points[-1, 0]
+        )
+
+    def stations(self, interval):
+        """Return the station grid: every interval from the start, plus the
+        control points and the polynomial breaks of both profiles."""
+        start, end = self.start, self.end
+        breaks = self._compile()[0]
+        grid = np.arange(max(int((end - start) / interval), 0)) * interval + start
+        # drop the grid points a rounding error away from a break
+        i = np.clip(np.searchsorted(breaks, grid), 1, len(breaks) - 1)
+        gap = np.minimum(grid - breaks[i - 1], breaks[i] - grid)
+        return np.union1d(grid[np.abs(gap) > 1e-9 * interval], breaks)
+
+    def evaluate(self, x):
+        """Return the elevations and plan offsets at the given stations.
+
+        Returns:
+            tuple: ``(y, z)`` arrays with the shape of x. Stations outside
+            either profile are nan.
+        """
+        return self.elevation.evaluate(x), self.plan.evaluate(x)
+
+    def profile(self, interval):
+        """Return the coordinates of the cable on its station grid.
+
+        Args:
+            interval (float): The largest interval between each station.
+
+        Returns:
+            numpy.ndarray: An (n, 3) array of x, y (elevation) and z (plan)
+            coordinates.
+        """
+        x = self.stations(interval)
+        coordinates = np.empty((len(x), 3))
+        coordinates[:, 0] = x
+        coordinates[:, 1], coordinates[:, 2] = self.evaluate(x)
         return coordinates
+
+    def _compile(self):
+        """Return the union breaks, the (c1, c2) slope coefficients of both
+        profiles on each piece, and the cumulative length and angle change at
+        each break."""
+        elevation, plan = self.elevation._compile(), self.plan._compile()
+        if self._compiled is not None:
+            compiled_elevation, compiled_plan, compiled = self._compiled
+            # the profiles are recompiled whenever they are edited
+            if compiled_elevation is elevation and compiled_plan is plan:
+                return compiled
+        start, end = self.start, self.end
+        if not start < end:
+            raise ValueError("The elevation and plan profiles do not overlap.")
+        breaks = np.union1d(elevation[0], plan[0])
+        breaks = np.union1d(breaks[(breaks > start) & (breaks < end)], [start, end])
+        widths = np.diff(breaks)
+        slopes = []
+        for cable in (self.elevation, self.plan):
+            # the quadratic of each piece, moved to start at the piece start
+            _, t, (_, c1, c2) = cable._locate(breaks[:-1])
+            slopes.extend((c1 + 2 * c2 * t, c2))
+        c1y, c2y, c1z, c2z = slopes
+        lengths = _arc_length_3d(c1y, c2y, c1z, c2z, widths)
+        lengths = np.concatenate(([0.0], np.cumsum(lengths)))
+        end_y, end_z = c1y + 2 * c2y * widths, c1z + 2 * c2z * widths
+        # the tangent turns in one plane along a piece
+        turns = _tangent_angle(c1y, c1z, end_y, end_z)
+        turns[:-1] += _tangent_angle(end_y[:-1], end_z[:-1], c1y[1:], c1z[1:])
+        angles = np.concatenate(([0.0], np.cumsum(turns)))
+        compiled = (breaks, np.stack(slopes, axis=1), lengths, angles)
+        self._compiled = (elevation, plan, compiled)
+        return compiled
+
+    def _locate(self, x):
+        """Return the piece, the offset in the piece and the slope
+        coefficients of stations x; t is nan outside the cable."""
+        breaks, slopes, _, _ = self._compile()
+        x = np.asarray(x, dtype=float)
+        piece = np.clip(
+            np.searchsorted(breaks, x, side="right") - 1, 0, len(slopes) - 1
+        )
+        inside = (x >= breaks[0]) & (x <= breaks[-1])
+        t = np.where(inside, x - breaks[piece], np.nan)
+        return piece, t, slopes[piece].T
+
+    def cumulative_length(self, x):
+        """Return the 3D length of the cable from its start to the given stations."""
+        piece, t, (c1y, c2y, c1z, c2z) = self._locate(x)
+        return self._compile()[2][piece] + _arc_length_3d(c1y, c2y, c1z, c2z, t)
+
+    def cumulative_angle(self, x):
+        """Return the total 3D angle change in radians from the start of the
+        cable to the given stations, including kinks; see
+        Cable2D.cumulative_angle."""
+        piece, t, (c1y, c2y, c1z, c2z) = self._locate(x)
+        turn = _tangent_angle(c1y, c1z, c1y + 2 * c2y * t, c1z + 2 * c2z * t)
+        return self._compile()[3][piece] + turn
+
+    def length(self, x1=None, x2=None):
+        """Return the 3D length of the cable between two stations, the whole
+        cable by default."""
+        return self._between(self.cumulative_length, x1, x2)
+
+    def angle_change(self, x1=None, x2=None):
+        """Return the total 3D angle change in radians between two stations,
+        the whole cable by default."""
+        return self._between(self.cumulative_angle, x1, x2)
+
+    def _between(self, cumulative, x1, x2):
+        x1 = self.start if x1 is None else x1
+        x2 = self.end if x2 is None else x2
+        difference = np.abs(cumulative(x2) - cumulative(x1))
+        return difference[()] if np.ndim(difference) == 0 else difference
+
+
+def mirror_profile(coordinates, station=None):
+    """Return a profile followed by its mirror image about a station.
+
+    The mirrored half is produced by reflecting the coordinates, so the two
+    halves are exactly symmetric and nothing is evaluated twice.
+
+    Args:
+        coordinates (numpy.ndarray): An (n, 2) array of coordinates.
+        station (float, optional): The x coordinate of the axis of symmetry,
+            the end of the profile by default. A point lying on the axis is
+            not repeated.
+
+    Returns:
+        numpy.ndarray: The (2n - 1, 2) or (2n, 2) mirrored profile.
+    """
+    if station is None:
+        station = coordinates[-1, 0]
+    on_axis = coordinates[-1, 0] == station
+    n = len(coordinates)
+    mirrored = coordinates[-1 - on_axis :: -1] if n > on_axis else coordinates[:0]
+    out = np.empty((n + len(mirrored), 2))
+    out[:n] = coordinates
+    out[n:, 0] = 2 * station - mirrored[:, 0]
+    out[n:, 1] = mirrored[:, 1]
+    return out
+
+
+def repeat_profile(coordinates, count, span=None):
+    """Return a profile repeated count times, each copy shifted by span.
+
+    Use it for the identical spans of a continuous girder: the base span is
+    evaluated once and the others are translated copies.
+
+    Args:
+        coordinates (numpy.ndarray): An (n, 2) array of coordinates.
+        count (int): The number of copies.
+        span (float, optional): The x offset between copies, the length of
+            the profile by default. When a copy starts where the previous one
+            ends, the shared point is not repeated.
+
+    Returns:
+        numpy.ndarray: The repeated profile.
+    """
+    if span is None:
+        span = coordinates[-1, 0] - coordinates[0, 0]
+    continuous = np.allclose(coordinates[0] + (span, 0.0), coordinates[-1])
+    base = coordinates[:-1] if continuous else coordinates
+    out = np.empty((count * len(base) + continuous, 2))
+    for i in range(count):
+        out[i * len(base) : (i + 1) * len(base), 0] = base[:, 0] + i * span
+        out[i * len(base) : (i + 1) * len(base), 1] = base[:, 1]
+    if continuous:
+        out[-1, 0] = coordinates[-1, 0] + (count - 1) * span
+        out[-1, 1] = coordinates[-1, 1]
+    return out
+
+
+def iter_mirrored_profile(cable, interval, chunk_size=65536):
+    """Yield the chunks of ``mirror_profile(cable.profile(interval))``.
+
+    Only one chunk is held in memory at a time.
+    """
+    station = cable.control_points[-1, 0]
+    yield from cable.iter_profile(interval, chunk_size)
+    first = True
+    for chunk in cable.iter_profile(interval, chunk_size, reverse=True):
+        if first:
+            # the cable end lies on the axis and is already in the first half
+            chunk, first = chunk[1:], False
+        chunk[:, 0] = 2 * station - chunk[:, 0]
+        yield chunk
+
+
+# the design quantities returned by CableBatch.summary
+SUMMARY_DTYPE = np.dtype(
+    [("min_y", float), ("max_y", float), ("length", float), ("angle_change", float)]
+)
+
+
+class CableBatch:
+    """Many cables stored as flat arrays and evaluated together.
+
+    The cables are laid out one after the other: the control points of cable
+    ``i`` are ``control_points[offsets[i]:offsets[i + 1]]`` and its segments
+    are the consecutive pairs of those points, in the same order as
+    ``segment_codes``.
+
+    Args:
+        control_points (array_like): (n_points, 2) control points of all cables.
+        segment_codes (array_like): (n_points - n_cables,) segment type codes,
+            see ``SEGMENT_TYPE_CODES``.
+        offsets (array_like): (n_cables + 1,) index of the first control point
+            of each cable, followed by n_points.
+    """
+
+    def __init__(self, control_points, segment_codes, offsets):
+        self.control_points = np.asarray(control_points, dtype=float).reshape(-1, 2)
+        self.segment_codes = np.asarray(segment_codes, dtype=np.int8)
+        self.offsets = np.asarray(offsets, dtype=np.intp)
+        if self.offsets[0] != 0 or self.offsets[-1] != len(self.control_points):
+            raise ValueError(
+                "offsets should start at 0 and end at the number of control points."
+            )
+        if np.any(np.diff(self.offsets) < 1):
+            raise ValueError("Every cable needs at least one control point.")
+        if len(self.segment_codes) != len(self.control_points) - len(self):
+            raise ValueError(
+                "Each cable should have one more control point than segments."
+            )
+        # every control point except the last one of each cable starts a segment
+        is_start = np.ones(len(self.control_points), dtype=bool)
+        is_start[self.offsets[1:] - 1] = False
+        self._start_index = np.flatnonzero(is_start)
+        self._segment_offsets = self.offsets - np.arange(len(self.offsets))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __repr__(self) -> str:
+        return f"CableBatch({len(self)} cables, {len(self.segment_codes)} segments)"
+
+    @classmethod
+    def from_cables(cls, cables):
+        """Return a CableBatch holding the given Cable2D objects."""
+        control_points = [c.control_points for c in cables]
+        codes = np.concatenate([c.segment_codes for c in cables])
+        if (codes < 0).any():
+            raise ValueError("Unknown segment type.")
+        offsets = np.concatenate(([0], np.cumsum([len(p) for p in control_points])))
+        return cls(np.concatenate(control_points), codes, offsets)
+
+    def profile(self, interval):
+        """Return the coordinates of every cable profile.
+
+        Each cable is sampled exactly as ``Cable2D.profile`` would, but all
+        segments of one type are evaluated in a single vectorized call.
+
+        Args:
+            interval (float): The interval between each point.
+
+        Returns:
+            tuple: ``(coordinates, offsets)`` where coordinates is an (n, 2)
+            array and the profile of cable i is
+            ``coordinates[offsets[i]:offsets[i + 1]]``.
+        """
+        x1, y1 = self.control_points[self._start_index].T
+        x2, y2 = self.control_points[self._start_index + 1].T
+        counts = _point_counts(x1, y1, x2, y2, self.segment_codes, interval)
+        # first point of each segment among all segment points
+        segment_starts = np.concatenate(([0], np.cumsum(counts)))
+        cable_counts = (
+            segment_starts[self._segment_offsets[1:]]
+            - segment_starts[self._segment_offsets[:-1]]
+            + 1
+        )
+        offsets = np.concatenate(([0], np.cumsum(cable_counts)))
+
+        points = _sample_segments(
+            x1,
+            y1,
+            x2,
+            y2,
+            self.segment_codes,
+            counts,
+            np.empty((segment_starts[-1], 2)),
+        )
+
+        coordinates = np.empty((offsets[-1], 2))
+        # every preceding cable contributes its endpoint to the output
+        segment_cable = np.repeat(np.arange(len(self)), np.diff(self._segment_offsets))
+        position = np.arange(len(points)) + np.repeat(segment_cable, counts)
+        coordinates[position] = points
+        coordinates[offsets[1:] - 1] = self.control_points[self.offsets[1:] - 1]
+        return coordinates, offsets
+
+    def summary(self):
+        """Return design quantities of each cable without sampling a profile.
+
+        They are computed from the polynomial pieces of all cables at once
+        (see Cable2D.polynomial): the extreme y values on each piece are at
+        its ends or its vertex, and the length and angle change are those of
+        Cable2D.length and Cable2D.angle_change.
+
+        Returns:
+            numpy.ndarray: A structured array with the min_y, max_y, length
+            and angle_change of each cable; nan for cables with a segment of
+            unknown type or that does not run forwards.
+        """
+        x1, y1 = self.control_points[self._start_index].T
+        x2, y2 = self.control_points[self._start_index + 1].T
+        c0, c1, c2 = _coefficients(x1, y1, x2, y2, self.segment_codes).reshape(-1, 3).T
+        widths = np.repeat((x2 - x1) / 2, 2)
+        segment_cable = np.repeat(np.arange(len(self)), np.diff(self._segment_offsets))
+        piece_cable = np.repeat(segment_cable, 2)
+
+        # invalid cables have infinite or nan coefficients and end up nan
+        with np.errstate(divide="ignore", invalid="ignore"):
+            end_slopes = c1 + 2 * c2 * widths
+            start_angles, end_angles = np.arctan(c1), np.arctan(end_slopes)
+            turns = np.abs(end_angles - start_angles)
+            # the kinks between consecutive pieces of the same cable
+            kinks = np.abs(start_angles[1:] - end_angles[:-1])
+            turns[:-1] += np.where(piece_cable[1:] == piece_cable[:-1], kinks, 0.0)
+            lengths = _arc_length(c1, c2, widths)
+            ends = c0 + (c1 + c2 * widths) * widths
+            vertex = -c1 / (2 * c2)
+            inside = (vertex > 0) & (vertex < widths)
+            vertices = np.where(inside, c0 - c1 * c1 / (4 * c2), c0)
+        lows = np.minimum(np.minimum(c0, ends), vertices)
+        highs = np.maximum(np.maximum(c0, ends), vertices)
+        valid = ~((widths <= 0) | np.isnan(c0))
+
+        summary = np.empty(len(self), dtype=SUMMARY_DTYPE)
+        # a cable without segments is a single point
+        points = self.control_points[self.offsets[:-1]]
+        summary["min_y"] = summary["max_y"] = points[:, 1]
+        summary["length"] = summary["angle_change"] = 0.0
+        piece_offsets = 2 * self._segment_offsets
+        has_pieces = np.diff(piece_offsets) > 0
+        starts = piece_offsets[:-1][has_pieces]
+        if len(starts):
+            summary["min_y"][has_pieces] = np.minimum.reduceat(lows, starts)
+            summary["max_y"][has_pieces] = np.maximum.reduceat(highs, starts)
+            summary["length"][has_pieces] = np.add.reduceat(lengths, starts)
+            summary["angle_change"][has_pieces] = np.add.reduceat(turns, starts)
+            invalid = np.zeros(len(self), dtype=bool)
+            invalid[has_pieces] = np.logical_or.reduceat(~valid, starts)
+            for name in SUMMARY_DTYPE.names:
+                summary[name][invalid] = np.nan
+        return summary
+
+    def save(self, path, interval, names=None, dtype=None):
+        """Write every cable profile to one npz container.
+
+        Args:
+            path (str or file): The file to write to.
+            interval (float): The interval between each point.
+            names (list, optional): The name of each cable.
+            dtype (optional): The dtype to store, e.g. ``numpy.float32``.
+        """
+        coordinates, offsets = self.profile(interval)
+        save_container(path, coordinates, offsets, names=names, dtype=dtype)
@@ -0,0 +1,154 @@
+"""Content-addressed cache of computed cable profiles."""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def profile_key(rows, interval, symmetric):
+    """Return a hash identifying the profile of a segments table state.
+
+    Args:
+        rows (list): The segments table rows.
+        interval (float): The interval between each point.
+        symmetric (bool): Whether the cable is mirrored.
+
+    Returns:
+        str: A hex digest, equal for equal inputs in any process.
+    """
+    payload = json.dumps([rows, interval, symmetric], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ProfileCache:
+    """A bounded cache of profile coordinates with least recently used eviction.
+
+    By default the entries live in the memory of the current process. Given a
+    directory, each entry is stored there as a ``.npy`` file instead, so that
+    all processes using the same directory (e.g. gunicorn workers) share the
+    entries; the file modification time records the last use.
+
+    Args:
+        maxsize (int): The maximum number of profiles kept.
+        directory (str, optional): The directory to store the profiles in.
+
+    Attributes:
+        hits (int): The number of lookups answered from the cache.
+        misses (int): The number of lookups that were not.
+    """
+
+    def __init__(self, maxsize=128, directory=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"ProfileCache(hits={self.hits}, misses={self.misses}, "
+            f"size={len(self)}, maxsize={self.maxsize})"
+        )
+
+    def __len__(self) -> int:
+        if self.directory is None:
+            return len(self._entries)
+        return len(self._files())
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def _files(self):
+        return [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".npy")
+        ]
+
+    def get(self, key):
+        """Return the cached coordinates for key, or None."""
+        with self._lock:
+            coordinates = self._get(key)
+            if coordinates is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return coordinates
+
+    def _get(self, key):
+        if self.directory is None:
+            coordinates = self._entries.get(key)
+            if coordinates is not None:
+                self._entries.move_to_end(key)
+            return coordinates
+        try:
+            coordinates = np.load(self._path(key))
+            os.utime(self._path(key))
+        except (FileNotFoundError, ValueError):
+            # missing, or evicted by another process while reading
+            return None
+        return coordinates
+
+    def set(self, key, coordinates):
+        """Store coordinates under key, evicting the least recently used.
+
+        In memory the array itself is stored, shared with every later caller,
+        so it is made read-only.
+        """
+        with self._lock:
+            if self.directory is None:
+                coordinates.flags.writeable = False
+                self._entries[key] = coordinates
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                return
+            # write to a temporary file first so readers never see half a file
+            fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, coordinates)
+            os.replace(tmp_path, self._path(key))
+            files = self._files()
+            if len(files) > self.maxsize:
+                files.sort(key=_mtime)
+                for path in files[: len(files) - self.maxsize]:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+    def get_or_compute(self, key, compute):
+        """Return the cached coordinates for key, calling compute() on a miss."""
+        coordinates = self.get(key)
+        if coordinates is None:
+            coordinates = compute()
+            self.set(key, coordinates)
+        return coordinates
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self._entries.clear()
+            if self.directory is not None:
+                for path in self._files():
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        return 0.0
@@ -0,0 +1,193 @@
+"""Clearance between cables, and cover to the outline of the member.
+
+The cables are compared through their polynomial pieces (see
+``Cable2D.polynomial``) rather than sampled profiles. The pieces are sorted
+by their first station and each one is only paired with the following pieces
+starting before it ends (a sweep and prune over the stations). Pairs whose
+bounding boxes are further apart than the required distance are dropped, and
+for each remaining pair the smallest separation is found in closed form, the
+difference of two quadratics being a quadratic.
+
+Separations and covers are measured vertically, at a station.
+
+Usage::
+
+    from cableprofile.clearance import clearance_violations, cover_violations
+
+    clearance_violations(cables, 0.100)
+    cover_violations(cables, soffit, 0.075, side="below")
+"""
+
+import numpy as np
+
+VIOLATION_DTYPE = np.dtype(
+    [("cable", np.intp), ("other", np.intp), ("station", float), ("separation", float)]
+)
+COVER_VIOLATION_DTYPE = np.dtype(
+    [("cable", np.intp), ("station", float), ("cover", float)]
+)
+sides = ("below", "above")
+
+
+def clearance_violations(cables, clearance):
+    """Return where cables come closer to each other than clearance.
+
+    Args:
+        cables (list): The Cable2D objects, in one plane.
+        clearance (float): The smallest allowed vertical separation.
+
+    Returns:
+        numpy.ndarray: A structured array with one row per pair of overlapping
+        pieces of two cables coming closer than clearance: the indices of the
+        two cables (cable < other), the station of the smallest separation
+        and that separation, 0 where the cables cross. The rows are sorted by
+        cable, other and station, a minimum at a break between pieces being
+        reported once.
+    """
+    pieces = _pieces(cables)
+    cable, x0, x1, low, high, coefficients = pieces
+    first, second = _overlapping(x0, x1)
+    keep = cable[first] != cable[second]
+    # boxes apart by more than clearance
+    keep &= low[second] - high[first] < clearance
+    keep &= low[first] - high[second] < clearance
+    first, second = first[keep], second[keep]
+
+    start = np.maximum(x0[first], x0[second])
+    width = np.minimum(x1[first], x1[second]) - start
+    difference = _at(pieces, first, start) - _at(pieces, second, start)
+    t, separation = _minimum(*difference, width, absolute=True)
+    violated = separation < clearance
+
+    a, b = cable[first][violated], cable[second][violated]
+    violations = np.empty(violated.sum(), dtype=VIOLATION_DTYPE)
+    violations["cable"] = np.minimum(a, b)
+    violations["other"] = np.maximum(a, b)
+    violations["station"] = (start + t)[violated]
+    violations["separation"] = separation[violated]
+    return np.unique(violations)
+
+
+def cover_violations(cables, boundary, cover, side="below"):
+    """Return where cables come closer than cover to a boundary polyline.
+
+    Args:
+        cables (list): The Cable2D objects.
+        boundary (array_like): The (m, 2) x, y points of an outline of the
+            member in the plane of the cables, e.g. its soffit, sorted by x.
+            Stations outside it are not checked.
+        cover (float): The smallest allowed vertical distance to the boundary.
+        side (str): Where the boundary is relative to the cables, "below"
+            (e.g. the soffit) or "above" (e.g. the top of the deck).
+
+    Returns:
+        numpy.ndarray: A structured array with one row per piece of a cable
+        with less cover than required: the index of the cable, the station of
+        the smallest cover and that cover, negative where the cable is on the
+        wrong side of the boundary. The rows are sorted by cable and station,
+        a minimum at a break between pieces being reported once.
+    """
+    if side not in sides:
+        raise ValueError(f"side should be one of {sides}, got {side!r}.")
+    boundary = np.asarray(boundary, dtype=float)
+    x, y = boundary[:, 0], boundary[:, 1]
+    dx = np.diff(x)
+    keep = dx > 0
+    slope = np.diff(y)[keep] / dx[keep]
+    line = np.column_stack((y[:-1][keep], slope, np.zeros_like(slope)))
+    pieces = _pieces(cables, extra=(x[:-1][keep], x[1:][keep], line))
+    cable, x0, x1, low, high, coefficients = pieces
+    first, second = _overlapping(x0, x1)
+    # pair every cable piece with the boundary pieces (cable -1) over it
+    is_line = cable[first] < 0
+    keep = is_line != (cable[second] < 0)
+    first, second = first[keep], second[keep]
+    line_piece = np.where(is_line[keep], first, second)
+    cable_piece = np.where(is_line[keep], second, first)
+    sign = 1.0 if side == "below" else -1.0
+    if side == "below":
+        keep = low[cable_piece] - high[line_piece] < cover
+    else:
+        keep = low[line_piece] - high[cable_piece] < cover
+    line_piece, cable_piece = line_piece[keep], cable_piece[keep]
+
+    start = np.maximum(x0[line_piece], x0[cable_piece])
+    width = np.minimum(x1[line_piece], x1[cable_piece]) - start
+    difference = _at(pieces, cable_piece, start) - _at(pieces, line_piece, start)
+    t, distance = _minimum(*(sign * difference), width, absolute=False)
+    violated = distance < cover
+
+    violations = np.empty(violated.sum(), dtype=COVER_VIOLATION_DTYPE)
+    violations["cable"] = cable[cable_piece][violated]
+    violations["station"] = (start + t)[violated]
+    violations["cover"] = distance[violated]
+    return np.unique(violations)
+
+
+def _pieces(cables, extra=None):
+    """Return the cable index, extent, y bounds and coefficients of the
+    polynomial pieces of all cables, followed by the extra pieces (x0, x1,
+    coefficients) under the cable index -1."""
+    polynomials = [cable.polynomial() for cable in cables]
+    cable = [np.full(len(c), i) for i, (_, c) in enumerate(polynomials)]
+    x0 = [b[:-1] for b, _ in polynomials]
+    x1 = [b[1:] for b, _ in polynomials]
+    coefficients = [c for _, c in polynomials]
+    if extra is not None:
+        cable.append(np.full(len(extra[2]), -1))
+        x0.append(extra[0])
+        x1.append(extra[1])
+        coefficients.append(extra[2])
+    cable, x0, x1 = np.concatenate(cable), np.concatenate(x0), np.concatenate(x1)
+    coefficients = np.concatenate(coefficients).reshape(-1, 3)
+    c0, c1, c2 = coefficients.T
+    width = x1 - x0
+    end = c0 + (c1 + c2 * width) * width
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vertex = -c1 / (2 * c2)
+        inside = (vertex > 0) & (vertex < width)
+        top = np.where(inside, c0 - c1 * c1 / (4 * c2), c0)
+    low = np.minimum(np.minimum(c0, end), top)
+    high = np.maximum(np.maximum(c0, end), top)
+    return cable, x0, x1, low, high, coefficients
+
+
+def _overlapping(x0, x1):
+    """Return the index pairs of the pieces whose station ranges overlap."""
+    order = np.argsort(x0, kind="stable")
+    # the pieces after each piece in the sorted order, starting before its end
+    stop = np.searchsorted(x0[order], x1[order], side="left")
+    count = np.maximum(stop - np.arange(1, len(order) + 1), 0)
+    first = np.repeat(np.arange(len(order)), count)
+    offset = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    second = first + 1 + offset
+    return order[first], order[second]
+
+
+def _at(pieces, piece, x):
+    """Return the (3, k) coefficients of the given pieces moved to start at x."""
+    _, x0, _, _, _, coefficients = pieces
+    c0, c1, c2 = coefficients[piece].T
+    shift = x - x0[piece]
+    return np.array([c0 + (c1 + c2 * shift) * shift, c1 + 2 * c2 * shift, c2])
+
+
+def _minimum(d0, d1, d2, width, absolute):
+    """Return where on [0, width] d0 + d1 t + d2 t**2 (or its absolute value)
+    is smallest, and that value."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        candidates = [np.zeros_like(d0), width, -d1 / (2 * d2)]
+        if absolute:
+            # the roots, where the cables cross
+            root = np.sqrt(d1 * d1 - 4 * d0 * d2)
+            q = -(d1 + np.copysign(root, d1)) / 2
+            candidates += [q / d2, d0 / q]
+        t = np.stack(candidates)
+        value = d0 + (d1 + d2 * t) * t
+    if absolute:
+        value = np.abs(value)
+    value[~((t >= 0) & (t <= width))] = np.inf
+    value[np.isnan(value)] = np.inf
+    best = np.argmin(value, axis=0)
+    columns = np.arange(len(d0))
+    return t[best, columns], value[best, columns]
@@ -0,0 +1,284 @@
+"""Console script for cableprofile."""
+
+import csv
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import click
+import numpy as np
+
+from cableprofile.cableprofile import Cable2D
+from cableprofile.export import save_container, save_profile, write_csv
+
+default_interval = 0.050
+# the columns of a csv cable schedule
+schedule_columns = (
+    "segment_type",
+    "segment_start_x",
+    "segment_start_y",
+    "segment_end_x",
+    "segment_end_y",
+)
+
+
+def is_schedule(path):
+    """Return whether a .json or .csv file looks like a cable schedule.
+
+    A csv file is a schedule if its header has the segments table columns,
+    so profiles written by this command are told apart.
+    """
+    if path.endswith(".json"):
+        return True
+    if not path.endswith(".csv"):
+        return False
+    with open(path, newline="") as f:
+        header = next(csv.reader(f), [])
+    return set(schedule_columns) <= set(header)
+
+
+def load_cables(path):
+    """Return the cable definitions in a .json or .csv file.
+
+    A json file holds one cable, a list of cables or ``{"cables": [...]}``,
+    each cable being ``{"name": ..., "control_points": [[x, y], ...],
+    "segment_types": [...], "interval": ...}`` (name and interval optional).
+
+    A csv file has the columns of the app's segments table (segment_type,
+    segment_start_x, segment_start_y, segment_end_x, segment_end_y), one row
+    per segment; an optional ``cable`` column holds several cables.
+
+    Returns:
+        list: One dict per cable with name, control_points, segment_types and
+        interval (None if not given) keys.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if path.endswith(".json"):
+        with open(path) as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("cables", [data])
+        cables = [
+            {
+                "name": cable.get("name"),
+                "control_points": [tuple(p) for p in cable["control_points"]],
+                "segment_types": list(cable["segment_types"]),
+                "interval": cable.get("interval"),
+            }
+            for cable in data
+        ]
+    elif path.endswith(".csv"):
+        if not is_schedule(path):
+            raise click.BadParameter(
+                f"{path} has no {', '.join(schedule_columns)} columns."
+            )
+        rows_by_cable = {}
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                rows_by_cable.setdefault(row.get("cable"), []).append(row)
+        cables = [
+            {
+                "name": name,
+                "control_points": [
+                    (float(r["segment_start_x"]), float(r["segment_start_y"]))
+                    for r in rows
+                ]
+                + [
+                    (float(rows[-1]["segment_end_x"]), float(rows[-1]["segment_end_y"]))
+                ],
+                "segment_types": [r["segment_type"] for r in rows],
+                "interval": None,
+            }
+            for name, rows in rows_by_cable.items()
+        ]
+    else:
+        raise click.BadParameter(f"{path} is not a .json or .csv file.")
+    for i, cable in enumerate(cables):
+        if not cable["name"]:
+            cable["name"] = stem if len(cables) == 1 else f"{stem}_{i + 1}"
+        cable["source"] = path
+    return cables
+
+
+def make_cable(cable):
+    """Return the Cable2D of a cable definition.
+
+    Raises:
+        click.ClickException: If the definition is not a valid cable, e.g. it
+            has an unknown segment type, naming the cable and its file.
+    """
+    try:
+        points = np.asarray(cable["control_points"], dtype=float).reshape(-1, 2)
+        return Cable2D.from_arrays(points[:, 0], points[:, 1], cable["segment_types"])
+    except ValueError as error:
+        raise click.ClickException(
+            f"Cable {cable['name']} in {cable.get('source')}: {error}"
+        )
+
+
+def write_profile(cable, directory, fmt="csv", dtype=None, chunk_size=65536):
+    """Write the profile of a cable definition to <directory>/<name>.<fmt>.
+
+    csv files are written a chunk at a time; the other formats need the whole
+    profile in memory.
+
+    Returns:
+        tuple: The cable name and the number of points written.
+    """
+    path = os.path.join(directory, f"{cable['name']}.{fmt}")
+    if fmt != "csv":
+        name, coordinates = compute_profile(cable)
+        save_profile(path, coordinates, fmt=fmt, dtype=dtype)
+        return name, len(coordinates)
+    cable2d = make_cable(cable)
+    if cable.get("tolerance") is not None:
+        # adaptive profiles are small, there is nothing to stream
+        profile = [cable2d.profile(tolerance=cable["tolerance"])]
+    else:
+        profile = cable2d.iter_profile(cable["interval"], chunk_size)
+    with open(path, "w", newline="") as f:
+        n_points = write_csv(f, profile, dtype=dtype)
+    return cable["name"], n_points
+
+
+def compute_profile(cable):
+    """Return the name and profile coordinates of a cable definition."""
+    cable2d = make_cable(cable)
+    if cable.get("tolerance") is not None:
+        return cable["name"], cable2d.profile(tolerance=cable["tolerance"])
+    return cable["name"], cable2d.profile(cable["interval"])
+
+
+@click.group(invoke_without_command=True)
+@click.pass_context
+def main(ctx):
+    """Calculate cable profiles for prestressed concrete structures."""
+    if ctx.invoked_subcommand is None:
+        click.echo(ctx.get_help())
+    return 0
+
+
+@main.command()
+@click.argument("sources", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option(
+    "-o",
+    "--output",
+    default="profiles",
+    show_default=True,
+    type=click.Path(file_okay=False),
+    help="Directory to write the profiles to.",
+)
+@click.option(
+    "--interval",
+    type=float,
+    help=f"Interval between points, overriding the cable definitions "
+    f"[default: {default_interval}].",
+)
+@click.option(
+    "--tolerance",
+    type=float,
+    help="Place points adaptively so that the chords stay within this distance "
+    "of the curve, instead of at a fixed interval.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes.",
+)
+@click.option(
+    "-f",
+    "--format",
+    "fmt",
+    type=click.Choice(["csv", "npy", "parquet", "npz"]),
+    default="csv",
+    show_default=True,
+    help="Output format; npz writes all cables to one profiles.npz container.",
+)
+@click.option(
+    "--float32",
+    is_flag=True,
+    help="Store the profiles as float32; csv values are written to float32 precision.",
+)
+def profile(sources, output, interval, tolerance, jobs, fmt, float32):
+    """Write the profile of every cable in SOURCES to a file per cable.
+
+    SOURCES are .json/.csv cable schedules, or directories of them.
+    """
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            for name in sorted(os.listdir(source)):
+                path = os.path.join(source, name)
+                # skipping other csv files, e.g. profiles written earlier
+                if is_schedule(path):
+                    paths.append(path)
+        else:
+            paths.append(source)
+    cables = [cable for path in paths for cable in load_cables(path)]
+    counts = Counter(cable["name"] for cable in cables)
+    duplicates = sorted(name for name, count in counts.items() if count > 1)
+    if duplicates:
+        raise click.ClickException(f"Duplicate cable names: {', '.join(duplicates)}")
+    for cable in cables:
+        if interval is not None:
+            cable["interval"] = interval
+        elif cable["interval"] is None:
+            cable["interval"] = default_interval
+        cable["tolerance"] = tolerance
+        # fail before any profile is written
+        make_cable(cable)
+    if fmt == "npz":
+        outputs = [os.path.join(output, "profiles.npz")]
+    else:
+        outputs = [os.path.join(output, f"{name}.{fmt}") for name in counts]
+    sources = {os.path.realpath(path) for path in paths}
+    for path in outputs:
+        if os.path.realpath(path) in sources:
+            raise click.ClickException(f"{path} would overwrite a cable schedule.")
+    os.makedirs(output, exist_ok=True)
+
+    dtype = np.float32 if float32 else None
+    if fmt == "npz":
+        # the workers return their profiles and the container is written here
+        task, args = compute_profile, ()
+    else:
+        task, args = write_profile, (output, fmt, dtype)
+
+    results = {}
+    with click.progressbar(length=len(cables), label="Writing profiles") as bar:
+        if jobs == 1:
+            for cable in cables:
+                name, result = task(cable, *args)
+                results[name] = result
+                bar.update(1)
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = [executor.submit(task, cable, *args) for cable in cables]
+                for future in as_completed(futures):
+                    name, result = future.result()
+                    results[name] = result
+                    bar.update(1)
+
+    if fmt == "npz":
+        profiles = [results[name] for name in counts]
+        offsets = np.concatenate(([0], np.cumsum([len(p) for p in profiles])))
+        save_container(
+            os.path.join(output, "profiles.npz"),
+            np.concatenate(profiles),
+            offsets,
+            names=list(counts),
+            dtype=dtype,
+        )
+        n_points = offsets[-1]
+    else:
+        n_points = sum(results.values())
+    click.echo(f"Wrote {len(cables)} profiles ({n_points} points) to {output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
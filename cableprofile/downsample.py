@@ -0,0 +1,65 @@
+"""Reduce a cable profile to a display resolution."""
+
+import numpy as np
+
+
+def lttb_indices(coordinates, n_out):
+    """Return the indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; the points in between are
+    split into n_out - 2 buckets and from each bucket the point forming the
+    largest triangle with the previously kept point and the average of the
+    next bucket is kept, which preserves the visual shape of the line.
+
+    Args:
+        coordinates (numpy.ndarray): An (n, 2) array of coordinates, sorted by x.
+        n_out (int): The number of points to keep.
+
+    Returns:
+        numpy.ndarray: The sorted indices of the kept points.
+    """
+    n = len(coordinates)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x, y = coordinates[:, 0], coordinates[:, 1]
+    # n_out - 2 buckets over the points between the first and the last
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    indices = np.empty(n_out, dtype=np.intp)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[hi : edges[i + 2]].mean()
+            next_y = y[hi : edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs(
+            (x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a])
+        )
+        a = lo + int(area.argmax())
+        indices[i + 1] = a
+    return indices
+
+
+def downsample(coordinates, n_out, keep_x=()):
+    """Return about n_out points of a profile for display.
+
+    Args:
+        coordinates (numpy.ndarray): An (n, 2) array of coordinates, sorted by x.
+        n_out (int): The number of points to keep with LTTB.
+        keep_x (array_like): x coordinates whose nearest profile points are
+            always kept, e.g. the cable control points.
+
+    Returns:
+        numpy.ndarray: The kept coordinates, in order.
+    """
+    if len(coordinates) <= n_out:
+        return coordinates
+    indices = lttb_indices(coordinates, n_out)
+    keep_x = np.asarray(keep_x, dtype=float)
+    if keep_x.size:
+        keep = np.searchsorted(coordinates[:, 0], keep_x)
+        keep = np.clip(keep, 0, len(coordinates) - 1)
+        indices = np.union1d(indices, keep)
+    return coordinates[indices]
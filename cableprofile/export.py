@@ -0,0 +1,145 @@
+"""Writers and readers for computed cable profiles.
+
+Profiles are (n, 2) arrays of x, y coordinates. Besides csv, which
+``write_csv`` and ``iter_csv`` write a chunk at a time, they can be
+written as a raw ``.npy`` array, which ``numpy.load(path, mmap_mode="r")``
+maps without reading it, as Parquet (requires pandas and pyarrow), or, for
+many cables at once, as a ``.npz`` container holding all coordinates one
+cable after the other plus an offsets index.
+"""
+
+import os
+
+import numpy as np
+
+formats = ("csv", "npy", "parquet", "npz")
+
+
+def _format_of(path, fmt):
+    if fmt is None:
+        fmt = os.path.splitext(str(path))[1].lstrip(".").lower()
+    if fmt not in formats:
+        raise ValueError(f"Unknown profile format {fmt!r}, expected one of {formats}.")
+    return fmt
+
+
+def save_profile(path, coordinates, fmt=None, dtype=None):
+    """Write the coordinates of one cable profile.
+
+    Args:
+        path (str or file): The file to write to.
+        coordinates (numpy.ndarray): An (n, 2) array of coordinates.
+        fmt (str, optional): One of csv, npy, parquet or npz; taken from the
+            file extension by default.
+        dtype (optional): The dtype to store, e.g. ``numpy.float32`` to halve
+            the file size. Defaults to the dtype of coordinates.
+    """
+    fmt = _format_of(path, fmt)
+    coordinates = np.asarray(coordinates)
+    if dtype is not None:
+        coordinates = coordinates.astype(dtype, copy=False)
+    if fmt == "csv":
+        if hasattr(path, "write"):
+            write_csv(path, [coordinates])
+        else:
+            with open(path, "w", newline="") as f:
+                write_csv(f, [coordinates])
+    elif fmt == "npy":
+        np.save(path, coordinates)
+    elif fmt == "parquet":
+        import pandas as pd
+
+        pd.DataFrame(coordinates, columns=["x", "y"]).to_parquet(path, index=False)
+    else:
+        save_container(path, coordinates, [0, len(coordinates)])
+
+
+def iter_csv(chunks, dtype=None, index=False):
+    """Yield the csv text of a profile given a chunk at a time.
+
+    The header is ``x,y`` and every value is written as the shortest string
+    reading back as the same number of its dtype, as pandas writes floats.
+
+    Args:
+        chunks (iterable): (k, 2) arrays of coordinates, e.g. from
+            ``Cable2D.iter_profile``.
+        dtype (optional): The dtype to write the values in, e.g.
+            ``numpy.float32`` for shorter values. Defaults to that of the chunks.
+        index (bool): Whether to start each line with the number of the point,
+            under an empty header, as ``DataFrame.to_csv`` does.
+
+    Yields:
+        str: The header, then the lines of one chunk at a time.
+    """
+    yield ",x,y\n" if index else "x,y\n"
+    start = 0
+    for chunk in chunks:
+        chunk = np.asarray(chunk)
+        if dtype is not None:
+            chunk = chunk.astype(dtype, copy=False)
+        if chunk.dtype == np.float64:
+            # Python floats print the same as float64 scalars, and faster
+            x, y = chunk[:, 0].tolist(), chunk[:, 1].tolist()
+        else:
+            # str, as format() would print float32 scalars as Python floats
+            x, y = list(map(str, chunk[:, 0])), list(map(str, chunk[:, 1]))
+        if index:
+            lines = map("{},{},{}\n".format, range(start, start + len(x)), x, y)
+        else:
+            lines = map("{},{}\n".format, x, y)
+        start += len(x)
+        yield "".join(lines)
+
+
+def write_csv(f, chunks, dtype=None, index=False):
+    """Write a profile given a chunk at a time to a text file as csv.
+
+    See ``iter_csv`` for the arguments and the format.
+
+    Returns:
+        int: The number of points written.
+    """
+    n_points = 0
+
+    def counted(chunks):
+        nonlocal n_points
+        for chunk in chunks:
+            n_points += len(chunk)
+            yield chunk
+
+    for text in iter_csv(counted(chunks), dtype=dtype, index=index):
+        f.write(text)
+    return n_points
+
+
+def save_container(path, coordinates, offsets, names=None, dtype=None):
+    """Write many cable profiles to one .npz container.
+
+    Args:
+        path (str or file): The file to write to.
+        coordinates (numpy.ndarray): The (n, 2) coordinates of all cables, the
+            profile of cable i being ``coordinates[offsets[i]:offsets[i + 1]]``,
+            as returned by ``CableBatch.profile``.
+        offsets (array_like): The (n_cables + 1,) offsets index.
+        names (list, optional): The name of each cable.
+        dtype (optional): The dtype to store the coordinates with.
+    """
+    coordinates = np.asarray(coordinates)
+    if dtype is not None:
+        coordinates = coordinates.astype(dtype, copy=False)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if names is None:
+        names = [str(i + 1) for i in range(len(offsets) - 1)]
+    if len(names) != len(offsets) - 1:
+        raise ValueError("There should be one name per cable.")
+    np.savez(path, coordinates=coordinates, offsets=offsets, names=np.array(names))
+
+
+def load_container(path):
+    """Read a container written by save_container.
+
+    Returns:
+        tuple: ``(coordinates, offsets, names)``.
+    """
+    with np.load(path) as data:
+        return data["coordinates"], data["offsets"], [str(n) for n in data["names"]]
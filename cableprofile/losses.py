@@ -0,0 +1,153 @@
+"""Prestress force along tendons after friction, wobble and anchor set losses.
+
+The force at a distance s along a tendon jacked with a force P0 is
+
+    P(s) = P0 * exp(-(mu * theta(s) + k * s))
+
+where theta(s) is the total angle change of the tendon between the jacking
+end and s, mu the friction coefficient and k the wobble coefficient. The
+angle changes and lengths come from the cable geometry
+(``cumulative_angle`` and ``cumulative_length`` of Cable2D or Cable3D), so
+no profile has to be sampled.
+
+Usage::
+
+    from cableprofile.losses import force_profile
+
+    x = np.linspace(0.0, 30.0, 301)
+    force = force_profile(
+        [cable_1, cable_2], x, jacking_force=3.0e6, mu=0.2, wobble=0.002,
+        jacking="both", anchor_set=0.006, elastic_modulus=195e9, area=2.8e-3,
+    )
+"""
+
+import numpy as np
+
+jacking_ends = ("start", "end", "both")
+
+
+def force_profile(
+    cables,
+    x,
+    jacking_force,
+    mu,
+    wobble,
+    jacking="start",
+    anchor_set=0.0,
+    elastic_modulus=None,
+    area=None,
+):
+    """Return the prestress force along tendons at the given stations.
+
+    The tendon parameters are scalars or one value per tendon. The losses are
+    computed for all tendons and stations at once.
+
+    Args:
+        cables (Cable2D, Cable3D or list): The tendon profiles.
+        x (array_like): The sorted stations, (n,) for all tendons or
+            (n_tendons, n). With anchor set, they should cover the tendons
+            closely enough for the trapezoidal rule.
+        jacking_force (float or array_like): The force P0 at the jacking ends.
+        mu (float or array_like): The friction coefficient, per radian.
+        wobble (float or array_like): The wobble coefficient k, per unit of
+            tendon length.
+        jacking (str): The end(s) the tendons are jacked from: "start", "end"
+            or "both". Jacked from both ends, the force is the larger of the
+            forces from either end.
+        anchor_set (float or array_like): The draw-in of the wedges at lock-off,
+            in units of length.
+        elastic_modulus (float or array_like): The elastic modulus of the
+            tendons, needed with anchor set.
+        area (float or array_like): The cross-section area of the tendons,
+            needed with anchor set.
+
+    Returns:
+        numpy.ndarray: The (n_tendons, n) forces, or (n,) for a single cable.
+        Stations outside a tendon are nan.
+    """
+    if jacking not in jacking_ends:
+        raise ValueError(f"jacking should be one of {jacking_ends}, got {jacking!r}.")
+    single = not isinstance(cables, (list, tuple))
+    if single:
+        cables = [cables]
+    n_tendons = len(cables)
+    x = np.broadcast_to(np.asarray(x, dtype=float), (n_tendons, np.shape(x)[-1]))
+
+    angle = np.stack([c.cumulative_angle(xi) for c, xi in zip(cables, x)])
+    distance = np.stack([c.cumulative_length(xi) for c, xi in zip(cables, x)])
+    total_angle = np.array([c.angle_change() for c in cables])[:, None]
+    total_length = np.array([c.length() for c in cables])[:, None]
+
+    jacking_force = _per_tendon(jacking_force, n_tendons)
+    mu = _per_tendon(mu, n_tendons)
+    wobble = _per_tendon(wobble, n_tendons)
+    anchor_set = _per_tendon(anchor_set, n_tendons)
+    if anchor_set.any():
+        if elastic_modulus is None or area is None:
+            raise ValueError("Anchor set needs the elastic_modulus and area.")
+        # the area between the force profiles before and after lock-off
+        set_area = anchor_set * _per_tendon(elastic_modulus, n_tendons)
+        set_area *= _per_tendon(area, n_tendons)
+
+    forces = []
+    if jacking in ("start", "both"):
+        force = jacking_force * np.exp(-(mu * angle + wobble * distance))
+        if anchor_set.any():
+            force = _lock_off(force, distance, set_area)
+        forces.append(force)
+    if jacking in ("end", "both"):
+        # measured from the end, with the stations reversed for the lock-off
+        angle, distance = total_angle - angle, total_length - distance
+        force = jacking_force * np.exp(-(mu * angle + wobble * distance))
+        if anchor_set.any():
+            force = _lock_off(force[:, ::-1], distance[:, ::-1], set_area)[:, ::-1]
+        forces.append(force)
+    force = forces[0] if len(forces) == 1 else np.fmax(*forces)
+    # fmax would fill the stations outside a tendon from the other end
+    force[np.isnan(angle)] = np.nan
+    return force[0] if single else force
+
+
+def _per_tendon(value, n_tendons):
+    """Return a scalar or per tendon value as an (n_tendons, 1) column."""
+    value = np.asarray(value, dtype=float).reshape(-1)
+    return np.broadcast_to(value, (n_tendons,))[:, None].copy()
+
+
+def _lock_off(force, distance, set_area):
+    """Return the forces after the anchor set.
+
+    Near the jacking end the wedges pull back and the force profile is
+    reflected about a level c: the force becomes min(P, 2c - P), where c is
+    found so that the area between the two profiles, 2 * integral of
+    max(P - c, 0), equals anchor set * E * A. The forces are sorted from the
+    jacking end along axis 1.
+    """
+    valid = ~np.isnan(force)
+    f = np.where(valid, force, 0.0)
+    s = np.where(valid, distance, 0.0)
+    widths = np.where(valid[:, 1:] & valid[:, :-1], np.diff(s, axis=1), 0.0)
+    integral = np.zeros_like(f)
+    np.cumsum(widths * (f[:, 1:] + f[:, :-1]) / 2, axis=1, out=integral[:, 1:])
+    first = np.argmax(valid, axis=1)
+    start = s[np.arange(len(s)), first][:, None]
+    # the area lost if the set reaches each station, increasing along axis 1
+    lost = np.where(valid, 2 * (integral - (s - start) * f), -np.inf)
+
+    reached = lost >= set_area
+    j = np.argmax(reached, axis=1)
+    rows = np.arange(len(f))
+    previous = np.maximum(j - 1, first)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = (set_area[:, 0] - lost[rows, previous]) / (
+            lost[rows, j] - lost[rows, previous]
+        )
+    fraction = np.where(j > first, fraction, 0.0)
+    level = f[rows, previous] + fraction * (f[rows, j] - f[rows, previous])
+    # the set reaches past the far end: the whole profile is lowered
+    last = f.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    length = s[rows, last] - start[:, 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        whole = (integral[rows, last] - set_area[:, 0] / 2) / length
+    level = np.where(reached.any(axis=1), level, whole)[:, None]
+    return np.fmin(force, 2 * level - force)
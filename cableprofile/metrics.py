@@ -0,0 +1,184 @@
+"""Opt-in timing instrumentation rendered in the Prometheus text format.
+
+Timing is off unless the ``CABLEPROFILE_METRICS`` environment variable is set
+to a value other than ``0`` or ``enable()`` is called. While it is off,
+``timer`` and ``timed`` only check a module flag, so instrumented code runs
+at full speed.
+
+Usage::
+
+    from cableprofile import metrics
+
+    with metrics.timer("profile"):
+        ...
+
+    @metrics.timed("dataframe")
+    def build_dataframe(...):
+        ...
+
+    print(metrics.render())
+
+Each process keeps its own histograms.
+"""
+
+import bisect
+import functools
+import os
+import threading
+import time
+
+METRIC_NAME = "cableprofile_stage_duration_seconds"
+
+# upper bounds in seconds, from single segments up to whole requests
+DEFAULT_BUCKETS = (
+    0.00001,
+    0.00005,
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+enabled = os.environ.get("CABLEPROFILE_METRICS", "0") not in ("", "0")
+
+_histograms = {}
+_lock = threading.Lock()
+
+
+class Histogram:
+    """Counts of observed durations per bucket, with their sum."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # one count per bucket, plus one for values above the last bound
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def enable():
+    """Turn timing on."""
+    global enabled
+    enabled = True
+
+
+def disable():
+    """Turn timing off, keeping what was recorded."""
+    global enabled
+    enabled = False
+
+
+def reset():
+    """Forget every recorded duration."""
+    with _lock:
+        _histograms.clear()
+
+
+def observe(stage, seconds, **labels):
+    """Record a duration for a stage, with optional extra labels."""
+    key = (stage,) + tuple(sorted(labels.items()))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+
+class _Timer:
+    __slots__ = ("stage", "labels", "start")
+
+    def __init__(self, stage, labels):
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.stage, time.perf_counter() - self.start, **self.labels)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_null_timer = _NullTimer()
+
+
+def timer(stage, **labels):
+    """Return a context manager timing its block under a stage name.
+
+    Args:
+        stage (str): The stage label, e.g. "profile".
+        **labels: Extra labels, e.g. ``segment_type="Parabolic"``.
+    """
+    if enabled:
+        return _Timer(stage, labels)
+    return _null_timer
+
+
+def timed(stage, **labels):
+    """Return a decorator timing every call of a function under a stage name."""
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                observe(stage, time.perf_counter() - start, **labels)
+
+        return wrapper
+
+    return decorator
+
+
+def render():
+    """Return every histogram in the Prometheus text exposition format."""
+    lines = [
+        f"# HELP {METRIC_NAME} Time spent in each stage of a profile computation.",
+        f"# TYPE {METRIC_NAME} histogram",
+    ]
+    with _lock:
+        items = sorted(_histograms.items())
+        for (stage, *labels), histogram in items:
+            label_text = ",".join(
+                [f'stage="{stage}"'] + [f'{k}="{v}"' for k, v in labels]
+            )
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(
+                    f'{METRIC_NAME}_bucket{{{label_text},le="{bound:g}"}} {cumulative}'
+                )
+            lines.append(
+                f'{METRIC_NAME}_bucket{{{label_text},le="+Inf"}} {histogram.count}'
+            )
+            lines.append(f"{METRIC_NAME}_sum{{{label_text}}} {histogram.sum!r}")
+            lines.append(f"{METRIC_NAME}_count{{{label_text}}} {histogram.count}")
+    return "\n".join(lines) + "\n"
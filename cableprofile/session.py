@@ -0,0 +1,115 @@
+"""Server-side state of app sessions, e.g. the cable being edited."""
+
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+
+
+class SessionStore:
+    """Per-session state, dropped when a session is not used for ttl seconds.
+
+    By default the sessions live in the memory of the current process and the
+    state objects are kept as they are. Given a path, each state is pickled
+    into a SQLite database there instead, so that all processes using the same
+    file (e.g. gunicorn workers) share the sessions.
+
+    Args:
+        ttl (float): The number of seconds a session is kept after its last use.
+        path (str, optional): The SQLite database file to store the sessions in.
+    """
+
+    def __init__(self, ttl=3600.0, path=None):
+        self.ttl = ttl
+        self.path = path
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        if path is not None:
+            with closing(self._connect()) as connection, connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS sessions "
+                    "(id TEXT PRIMARY KEY, expires REAL, state BLOB)"
+                )
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires)"
+                )
+
+    def __repr__(self) -> str:
+        return f"SessionStore(size={len(self)}, ttl={self.ttl}, path={self.path!r})"
+
+    def __len__(self) -> int:
+        self.evict()
+        if self.path is None:
+            return len(self._sessions)
+        with closing(self._connect()) as connection:
+            return connection.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def _connect(self):
+        # a connection per call, as connections cannot be shared between threads
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, session_id):
+        """Return the state of a session, or None, and renew its time to live."""
+        now = time.time()
+        if self.path is None:
+            with self._lock:
+                entry = self._sessions.get(session_id)
+                if entry is None or entry[0] <= now:
+                    return None
+                self._sessions[session_id] = (now + self.ttl, entry[1])
+                self._sessions.move_to_end(session_id)
+                return entry[1]
+        with closing(self._connect()) as connection, connection:
+            row = connection.execute(
+                "SELECT state FROM sessions WHERE id = ? AND expires > ?",
+                (session_id, now),
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE sessions SET expires = ? WHERE id = ?",
+                (now + self.ttl, session_id),
+            )
+        return pickle.loads(row[0])
+
+    def set(self, session_id, state):
+        """Store the state of a session, dropping the expired sessions."""
+        self.evict()
+        expires = time.time() + self.ttl
+        if self.path is None:
+            with self._lock:
+                self._sessions[session_id] = (expires, state)
+                self._sessions.move_to_end(session_id)
+            return
+        state = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)",
+                (session_id, expires, state),
+            )
+
+    def delete(self, session_id):
+        """Drop a session."""
+        if self.path is None:
+            with self._lock:
+                self._sessions.pop(session_id, None)
+            return
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def evict(self):
+        """Drop the expired sessions."""
+        now = time.time()
+        if self.path is None:
+            with self._lock:
+                # in order of last use, so the expired sessions come first
+                while self._sessions:
+                    session_id, (expires, _) = next(iter(self._sessions.items()))
+                    if expires > now:
+                        break
+                    del self._sessions[session_id]
+            return
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM sessions WHERE expires <= ?", (now,))
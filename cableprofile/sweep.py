@@ -0,0 +1,137 @@
+"""Summaries of many variants of a cable, for preliminary design sweeps.
+
+A sweep moves control points of a base cable, e.g. the low point (drape),
+the inflection points or the anchor heights, through ranges of values and
+returns the design quantities of every combination, without sampling or
+keeping any profile::
+
+    from cableprofile.sweep import sweep
+
+    result = sweep(
+        cable,
+        {(2, "y"): np.linspace(0.10, 0.30, 21), ((1, 3), "x"): [1.2, 1.4, 1.6]},
+    )
+    ok = result[(result["min_y"] >= 0.12) & (result["angle_change"] < 0.25)]
+
+The variants are evaluated a chunk at a time as a CableBatch. Very large
+sweeps are split between worker processes, which write their rows straight
+into a memory-mapped result file.
+"""
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cableprofile.cableprofile import SUMMARY_DTYPE, CableBatch
+
+# from this many variants on, sweep uses every CPU unless told otherwise
+parallel_threshold = 1_000_000
+
+
+def sweep(cable, parameters, jobs=None, chunk_size=65536):
+    """Return the design quantities of every combination of parameter values.
+
+    Args:
+        cable (Cable2D): The base cable.
+        parameters (dict): Maps ``(point, axis)`` to the values to try, axis
+            being "x" or "y" and point the index of a control point, or a
+            tuple of indices of points moved together. The values replace
+            the coordinate of the base cable.
+        jobs (int, optional): The number of worker processes. By default one,
+            or the number of CPUs for sweeps of parallel_threshold variants
+            or more.
+        chunk_size (int): The number of variants evaluated at once, which
+            bounds the memory used by each process.
+
+    Returns:
+        numpy.ndarray: A structured array with one row per variant, in the
+        order of ``itertools.product`` over the parameter values. It has a
+        field per parameter, named after the axis and points (e.g. "y2" or
+        "x1_3"), followed by the fields of CableBatch.summary.
+    """
+    keys = list(parameters)
+    values = [np.asarray(parameters[key], dtype=float).reshape(-1) for key in keys]
+    assignments = [(_point_indices(points), _axis(axis)) for points, axis in keys]
+    names = [
+        "xy"[axis] + "_".join(str(i) for i in points) for points, axis in assignments
+    ]
+    n_variants = int(np.prod([len(v) for v in values]))
+    dtype = np.dtype([(name, float) for name in names] + SUMMARY_DTYPE.descr)
+    if jobs is None:
+        jobs = (os.cpu_count() or 1) if n_variants >= parallel_threshold else 1
+
+    base = np.asarray(cable.control_points, dtype=float)
+    codes = np.asarray(cable.segment_codes)
+    args = (base, codes, assignments, values)
+    starts = range(0, n_variants, chunk_size)
+    if jobs == 1 or len(starts) == 1:
+        result = np.empty(n_variants, dtype=dtype)
+        for start in starts:
+            stop = min(start + chunk_size, n_variants)
+            result[start:stop] = _evaluate(*args, start, stop, dtype)
+        return result
+
+    directory = tempfile.mkdtemp(prefix="cableprofile-sweep-")
+    try:
+        path = os.path.join(directory, "result.dat")
+        np.memmap(path, dtype=dtype, mode="w+", shape=(n_variants,)).flush()
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(
+                    _write_chunk,
+                    path,
+                    n_variants,
+                    *args,
+                    start,
+                    min(start + chunk_size, n_variants),
+                    dtype,
+                )
+                for start in starts
+            ]
+            for future in futures:
+                future.result()
+        return np.array(np.memmap(path, dtype=dtype, mode="r", shape=(n_variants,)))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _point_indices(points):
+    return tuple(np.atleast_1d(points).astype(int).tolist())
+
+
+def _axis(axis):
+    if axis not in ("x", "y"):
+        raise ValueError(f"axis should be 'x' or 'y', got {axis!r}.")
+    return "xy".index(axis)
+
+
+def _evaluate(base, codes, assignments, values, start, stop, dtype):
+    """Return the rows of variants start to stop."""
+    shape = [len(v) for v in values]
+    indices = np.unravel_index(np.arange(start, stop), shape)
+    rows = np.empty(stop - start, dtype=dtype)
+    points = np.repeat(base[None], stop - start, axis=0)
+    for name, (point, axis), v, i in zip(dtype.names, assignments, values, indices):
+        rows[name] = v[i]
+        points[:, point, axis] = v[i][:, None]
+    n_points = len(base)
+    batch = CableBatch(
+        points.reshape(-1, 2),
+        np.tile(codes, stop - start),
+        np.arange(stop - start + 1) * n_points,
+    )
+    summary = batch.summary()
+    for name in SUMMARY_DTYPE.names:
+        rows[name] = summary[name]
+    return rows
+
+
+def _write_chunk(path, n_variants, *args):
+    """Evaluate a chunk in a worker process and write it into the result file."""
+    *args, start, stop, dtype = args
+    result = np.memmap(path, dtype=dtype, mode="r+", shape=(n_variants,))
+    result[start:stop] = _evaluate(*args, start, stop, dtype)
+    result.flush()
@@ -10,21 +10,20 @@ with open('README.md') as readme_file:
 with open('HISTORY.rst') as history_file:
     history = history_file.read()
 
-requirements = ['Click>=7.0', ]
+requirements = ['Click>=7.0', 'numpy']
 
 test_requirements = ['pytest>=3', ]
 
 setup(
     author="Anuv Chakraborty",
     author_email='anuv.chakrabo@gmail.com',
-    python_requires='>=3.6',
+    python_requires='>=3.7',
     classifiers=[
         'Development Status :: 2 - Pre-Alpha',
         'Intended Audience :: Developers',
         'License :: OSI Approved :: MIT License',
         'Natural Language :: English',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
     ],
@@ -35,6 +34,7 @@ setup(
         ],
     },
     install_requires=requirements,
+    extras_require={'parquet': ['pandas', 'pyarrow']},
     license="MIT license",
     long_description=readme + '\n\n' + history,
     include_package_data=True,
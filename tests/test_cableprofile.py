@@ -2,11 +2,30 @@
 
 """Tests for `cableprofile` package."""
 
+import copy
+import json
+import os
+import pickle
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
 import pytest
 
 from click.testing import CliRunner
 
-from cableprofile import cableprofile
+from dash import Patch
+
+from cableprofile import app, cableprofile, metrics
+from cableprofile.cache import ProfileCache, profile_key
+from cableprofile.clearance import clearance_violations, cover_violations
+from cableprofile.downsample import downsample
+from cableprofile.export import load_container
+from cableprofile.losses import force_profile
+from cableprofile.session import SessionStore
+from cableprofile.sweep import sweep
 from cableprofile import cli
 
 import matplotlib.pyplot as plt
@@ -22,6 +41,31 @@ def response():
     # return requests.get('https://github.com/audreyr/cookiecutter-pypackage')
 
 
+@pytest.fixture
+def cable():
+    """A straight, a reverse curve and a parabola, fresh for every test."""
+    return cableprofile.Cable2D(
+        [(0.000, 2.325), (1.550, 2.233), (4.550, 2.303), (10.550, 1.945)],
+        ["straight", "reverse_curve", "parabolic"],
+    )
+
+
+def table_rows(cable):
+    """Return the segments table of a cable, as the app's DataTable sends it."""
+    points = cable.control_points_list
+    return [
+        {
+            "sl-no": i + 1,
+            "segment_type": segment_type,
+            "segment_start_x": points[i][0],
+            "segment_start_y": points[i][1],
+            "segment_end_x": points[i + 1][0],
+            "segment_end_y": points[i + 1][1],
+        }
+        for i, segment_type in enumerate(cable.segment_type_list)
+    ]
+
+
 def test_content(response):
     """Sample pytest test function with the pytest fixture as an argument."""
     # from bs4 import BeautifulSoup
@@ -33,7 +77,8 @@ def test_command_line_interface():
     runner = CliRunner()
     result = runner.invoke(cli.main)
     assert result.exit_code == 0
-    assert 'cableprofile.cli.main' in result.output
+    assert 'Usage:' in result.output
+    assert 'profile' in result.output
     help_result = runner.invoke(cli.main, ['--help'])
     assert help_result.exit_code == 0
     assert '--help  Show this message and exit.' in help_result.output
@@ -59,3 +104,808 @@ def test_Cable2D():
     plt.plot(*zip(*coordinates))
     plt.show()
 
+
+def test_CableBatch(cable):
+    cables = [
+        cable,
+        cableprofile.Cable2D(
+            [(0.000, 0.500), (7.525, 0.150), (15.050, 0.500)],
+            ["parabolic", "parabolic"],
+        ),
+    ]
+    batch = cableprofile.CableBatch.from_cables(cables)
+    coordinates, offsets = batch.profile(0.050)
+    assert len(offsets) == len(cables) + 1
+    for i, cable in enumerate(cables):
+        expected = cable.profile(0.050)
+        assert np.allclose(coordinates[offsets[i] : offsets[i + 1]], expected)
+
+
+def test_Cable2D_evaluate(cable):
+    coordinates = cable.profile(0.050)
+    shuffled = np.random.default_rng(0).permutation(coordinates)
+    assert np.allclose(cable.evaluate(shuffled[:, 0]), shuffled[:, 1])
+    assert np.isnan(cable.evaluate([-1.0, 11.0])).all()
+    point = cableprofile.Cable2D.from_arrays([1.000], [2.000], [])
+    y = point.evaluate([0.000, 1.000, 2.000])
+    assert np.array_equal(y, [np.nan, 2.000, np.nan], equal_nan=True)
+
+
+def test_Cable2D_iter_profile(cable):
+    chunks = list(cable.iter_profile(0.050, chunk_size=50))
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert np.allclose(np.concatenate(chunks), cable.profile(0.050))
+
+
+def test_Cable2D_profile_out(cable):
+    out = np.empty((cable.point_count(0.050), 2))
+    assert cable.profile(0.050, out=out) is out
+    assert (out == cable.profile(0.050)).all()
+    with pytest.raises(ValueError):
+        cable.profile(0.050, out=np.empty((3, 2)))
+
+
+def test_Cable2D_incremental(cable, monkeypatch):
+    control_points = cable.control_points_list
+    cable = cableprofile.Cable2D(
+        control_points, cable.segment_type_list, incremental=True
+    )
+    cable.profile(0.050)
+    # only the edited segments are re-evaluated, the parabola is left alone
+    monkeypatch.setitem(cableprofile._SEGMENT_KERNELS, cableprofile.PARABOLIC, None)
+    cable.update_control_point(1, 1.600, 2.200)
+    monkeypatch.undo()
+    cable.set_segment_type(0, "parabolic")
+    expected = cableprofile.Cable2D(
+        [(0.000, 2.325), (1.600, 2.200), (4.550, 2.303), (10.550, 1.945)],
+        ["parabolic", "reverse_curve", "parabolic"],
+    ).profile(0.050)
+    assert (cable.profile(0.050) == expected).all()
+    assert control_points[1] == (1.550, 2.233)
+
+
+@pytest.mark.parametrize("backend", ["memory", "directory"])
+def test_ProfileCache(backend, tmp_path):
+    directory = tmp_path if backend == "directory" else None
+    cache = ProfileCache(maxsize=2, directory=directory)
+    keys = [profile_key([{"segment_start_x": i}], 0.050, False) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.set(key, np.full((2, 2), float(i)))
+    assert len(cache) == 2
+    assert cache.get(keys[0]) is None
+    assert (cache.get(keys[2]) == 2.0).all()
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_command_line_profile(tmp_path):
+    cables = [
+        {
+            "name": "T1",
+            "control_points": [[0.000, 2.325], [1.550, 2.233], [4.550, 2.303]],
+            "segment_types": ["straight", "reverse_curve"],
+        },
+        {
+            "name": "T2",
+            "control_points": [[0.000, 0.500], [7.525, 0.150], [15.050, 0.500]],
+            "segment_types": ["parabolic", "parabolic"],
+            "interval": 0.100,
+        },
+    ]
+    (tmp_path / "schedule.json").write_text(json.dumps({"cables": cables}))
+    (tmp_path / "T3.csv").write_text(
+        "segment_type,segment_start_x,segment_start_y,segment_end_x,segment_end_y\n"
+        "straight,0.0,1.0,2.0,1.5\n"
+        "parabolic,2.0,1.5,6.0,0.5\n"
+    )
+    output = tmp_path / "profiles"
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.main, ["profile", str(tmp_path), "-o", str(output), "--jobs", "2"]
+    )
+    assert result.exit_code == 0, result.output
+    assert sorted(p.name for p in output.iterdir()) == ["T1.csv", "T2.csv", "T3.csv"]
+    profile = np.loadtxt(output / "T2.csv", delimiter=",", skiprows=1)
+    expected = cableprofile.Cable2D(
+        cables[1]["control_points"], cables[1]["segment_types"]
+    ).profile(0.100)
+    # written at full precision, the same as the library
+    assert np.array_equal(profile, expected)
+    cableprofile.Cable2D(
+        cables[1]["control_points"], cables[1]["segment_types"]
+    ).save(output / "library.csv", 0.100)
+    assert (output / "library.csv").read_text() == (output / "T2.csv").read_text()
+
+    schedule = str(tmp_path / "schedule.json")
+    result = runner.invoke(cli.main, ["profile", schedule, "-o", str(output), "--float32"])
+    assert result.exit_code == 0, result.output
+    profile = np.loadtxt(output / "T2.csv", delimiter=",", skiprows=1, dtype=np.float32)
+    assert np.array_equal(profile, expected.astype(np.float32))
+    result = runner.invoke(cli.main, ["profile", str(tmp_path), "--jobs", "0"])
+    assert result.exit_code != 0
+
+
+@pytest.mark.parametrize("fmt", ["csv", "npy", "parquet"])
+def test_Cable2D_save(fmt, tmp_path):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    cable = cableprofile.Cable2D(
+        [(0.000, 2.325), (1.550, 2.233), (4.550, 2.303)],
+        ["straight", "reverse_curve"],
+    )
+    path = tmp_path / f"profile.{fmt}"
+    cable.save(path, 0.050, dtype=np.float32)
+    if fmt == "csv":
+        saved = np.loadtxt(path, delimiter=",", skiprows=1)
+    elif fmt == "npy":
+        saved = np.load(path, mmap_mode="r")
+        assert saved.dtype == np.float32
+    else:
+        import pandas as pd
+
+        saved = pd.read_parquet(path).to_numpy()
+        assert saved.dtype == np.float32
+    assert np.allclose(saved, cable.profile(0.050), atol=1e-6)
+
+
+def test_CableBatch_save(tmp_path):
+    cables = [
+        cableprofile.Cable2D([(0.000, 2.325), (1.550, 2.233)], ["straight"]),
+        cableprofile.Cable2D([(0.000, 0.500), (7.525, 0.150)], ["parabolic"]),
+    ]
+    batch = cableprofile.CableBatch.from_cables(cables)
+    batch.save(tmp_path / "profiles.npz", 0.050, names=["T1", "T2"])
+    coordinates, offsets, names = load_container(tmp_path / "profiles.npz")
+    assert names == ["T1", "T2"]
+    assert np.allclose(coordinates[offsets[1] : offsets[2]], cables[1].profile(0.050))
+
+
+def test_metrics():
+    metrics.reset()
+    with metrics.timer("profile"):
+        pass
+    assert 'stage="profile"' not in metrics.render()
+    metrics.enable()
+    try:
+        cable = cableprofile.Cable2D(
+            [(0.000, 2.325), (1.550, 2.233), (4.550, 2.303)],
+            ["straight", "reverse_curve"],
+        )
+        with metrics.timer("profile"):
+            cable.profile(0.050)
+    finally:
+        metrics.disable()
+    text = metrics.render()
+    assert '_count{stage="profile"} 1' in text
+    assert '_bucket{stage="profile",le="+Inf"} 1' in text
+    assert '_count{stage="segment",segment_type="ReverseCurve"} 1' in text
+
+    # app requests are labelled by route, not by path
+    metrics.reset()
+    metrics.enable()
+    try:
+        client = app.server.test_client()
+        for path in ("/assets/a.css", "/assets/b.css", "/x", "/y/z"):
+            client.get(path)
+        # not allowed, so no route matched
+        client.post("/metrics")
+    finally:
+        metrics.disable()
+    text = metrics.render()
+    assert 'path="/assets/<path:filename>"} 2' in text
+    assert 'path="/<path:path>"} 2' in text
+    assert 'path="unmatched"} 1' in text
+    assert "a.css" not in text and 'path="/x"' not in text
+
+
+def test_downsample(cable):
+    control_points = cable.control_points_list
+    coordinates = cable.profile(0.001)
+    reduced = downsample(coordinates, 200, keep_x=[x for x, _ in control_points])
+    assert len(reduced) <= 200 + len(control_points)
+    assert np.isin([x for x, _ in control_points], reduced[:, 0]).all()
+    assert np.allclose(cable.evaluate(reduced[:, 0]), reduced[:, 1])
+    assert len(downsample(coordinates[:100], 200)) == 100
+
+
+def test_displayed_coordinates(cable, monkeypatch):
+    rows = table_rows(cable)
+    arrays = app.get_cable_arrays(rows)
+    coordinates = cableprofile.mirror_profile(cable.profile(0.001))
+    # few enough points that only the kept ones are sure to be drawn
+    monkeypatch.setattr(app, "display_points", 20)
+    shown = app.displayed_coordinates(coordinates, arrays, symmetric=True)
+    assert len(shown) <= 20 + 2 * len(arrays[0])
+    # the control points of both halves are drawn
+    x = np.array([x for x, _ in cable.control_points_list])
+    assert np.isin(np.concatenate((x, 2 * x[-1] - x)), shown[:, 0]).all()
+    monkeypatch.undo()
+    shown = app.displayed_coordinates(coordinates, arrays, symmetric=True)
+    assert app.webgl_threshold < len(shown) <= app.display_points + 2 * len(arrays[0])
+    assert app.profile_figure(shown)["data"][0]["type"] == "scattergl"
+    small = coordinates[: app.webgl_threshold]
+    assert app.displayed_coordinates(small, arrays, symmetric=True) is small
+    assert app.profile_figure(small)["data"][0]["type"] == "scatter"
+
+
+def test_Cable2D_profile_tolerance(cable):
+    coordinates = cable.profile(tolerance=0.5e-3)
+    assert len(coordinates) < len(cable.profile(0.050)) / 5
+    # straights collapse to their end points
+    assert coordinates[1, 0] == 1.550
+    dense = cable.profile(0.001)
+    chords = np.interp(dense[:, 0], coordinates[:, 0], coordinates[:, 1])
+    assert np.abs(chords - dense[:, 1]).max() <= 0.5e-3
+    with pytest.raises(ValueError):
+        cable.profile(0.050, tolerance=0.5e-3)
+    # zero-length and backwards straights get no points, as with an interval
+    for points in (
+        [(0.000, 0.000), (0.000, 0.000), (5.000, 1.000)],
+        [(0.000, 0.000), (-1.000, 0.500), (5.000, 1.000)],
+    ):
+        cable = cableprofile.Cable2D(points, ["straight", "parabolic"])
+        coordinates = cable.profile(tolerance=1e-3)
+        assert not np.isnan(coordinates).any()
+        assert cable.point_count(tolerance=1e-3) == len(coordinates)
+
+
+def test_mirror_and_repeat_profile(cable):
+    half = cable
+    control_points, segment_types = half.control_points_list, half.segment_type_list
+    mirrored = cableprofile.mirror_profile(half.profile(0.050))
+    # the same cable with its mirrored segments evaluated
+    full = cableprofile.Cable2D(
+        control_points + [(21.100 - x, y) for x, y in control_points[-2::-1]],
+        segment_types + segment_types[::-1],
+    )
+    assert mirrored.shape == full.profile(0.050).shape
+    assert np.allclose(mirrored, full.profile(0.050))
+    assert np.array_equal(mirrored[:, 1], mirrored[::-1, 1])
+    chunks = cableprofile.iter_mirrored_profile(half, 0.050, chunk_size=7)
+    assert np.array_equal(np.concatenate(list(chunks)), mirrored)
+
+    repeated = cableprofile.repeat_profile(mirrored, 3)
+    assert len(repeated) == 3 * len(mirrored) - 2
+    assert np.all(np.diff(repeated[:, 0]) > 0)
+    assert np.allclose(repeated[-1], (63.300, 2.325))
+
+
+def test_Cable2D_from_arrays(cable):
+    control_points, segment_types = cable.control_points_list, cable.segment_type_list
+    x, y = np.array(control_points).T
+    from_names = cableprofile.Cable2D.from_arrays(x, y, segment_types)
+    from_codes = cableprofile.Cable2D.from_arrays(
+        x, y, [cableprofile.STRAIGHT, cableprofile.REVERSE_CURVE, cableprofile.PARABOLIC]
+    )
+    table = pd.DataFrame(
+        {
+            "segment_type": segment_types,
+            "segment_start_x": x[:-1],
+            "segment_start_y": y[:-1],
+            "segment_end_x": x[1:],
+            "segment_end_y": y[1:],
+        }
+    )
+    from_table = cableprofile.Cable2D.from_dataframe(table)
+    for other in (from_names, from_codes, from_table):
+        assert other.control_points_list == control_points
+        assert other.segment_type_list == segment_types
+        assert np.array_equal(other.profile(0.050), cable.profile(0.050))
+    with pytest.raises(ValueError):
+        from_names.control_points[0, 1] = 0.0
+    with pytest.raises(ValueError):
+        cableprofile.Cable2D.from_arrays(x, y, ["straight", "circular", "parabolic"])
+    codes = cableprofile.segment_type_codes
+    assert codes(np.array([0.0, 1.0, np.nan, 0.5])).tolist() == [0, 1, -1, -1]
+    assert codes(np.array([256, -256, 2], dtype=np.int64)).tolist() == [-1, -1, 2]
+    with pytest.raises(ValueError):
+        cableprofile.Cable2D.from_arrays(x[:-1], y[:-1], segment_types)
+
+
+def test_segment_views(cable):
+    segment = cable.segment_list[1]
+    assert repr(segment) == "ReverseCurve((1.55, 2.233), (4.55, 2.303))"
+    assert not hasattr(segment, "__dict__")
+    cable.update_control_point(2, 4.600, 2.300)
+    assert segment.p2 == (4.600, 2.300)
+    standalone = cableprofile.ReverseCurve((1.550, 2.233), (4.600, 2.300))
+    assert np.array_equal(segment.get_coordinates(0.050), standalone.get_coordinates(0.050))
+    cable.set_segment_type(1, "parabolic")
+    assert type(cable.segment_list[1]) is cableprofile.Parabolic
+    # segment_list skips segments of unknown type
+    other = cableprofile.Cable2D(
+        cable.control_points_list, [None, "straight", "straight"]
+    )
+    assert len(other.segment_list) == 2
+    other.set_segment_type(2, "parabolic")
+    assert [type(s).__name__ for s in other.segment_list] == ["Straight", "Parabolic"]
+    other.set_segment_type(0, "straight")
+    assert len(other.segment_list) == 3
+    counts = [s.point_count(0.050) for s in cable.segment_list]
+    assert sum(counts) + 1 == cable.point_count(0.050)
+
+
+def test_Cable2D_geometry(cable):
+    coordinates = cable.profile(0.0001)
+    assert np.isclose(cable.length(), np.hypot(*np.diff(coordinates, axis=0).T).sum())
+    assert np.isclose(cable.length(0.0, 1.550), np.hypot(1.550, 0.092))
+    x = np.linspace(0.001, 10.549, 200)
+    h = 1e-6
+    gradient = (cable.evaluate(x + h) - cable.evaluate(x - h)) / (2 * h)
+    assert np.allclose(cable.slope(x), gradient, atol=1e-8)
+    assert np.isnan(cable.slope([-1.0, 11.0])).all()
+    # y = 1.945 + 0.358 / 36 (x - 10.55)^2 on the falling parabola
+    k = 0.358 / 6.000**2
+    assert np.isclose(cable.curvature(10.550), 2 * k)
+    assert np.isclose(cable.slope(4.550), -2 * k * 6.000)
+    # the kink at 1.550 and the two parabolas of the reverse curve
+    angle = np.arctan(0.092 / 1.550) + 2 * np.arctan(2 * 0.035 / 1.500)
+    assert np.isclose(cable.angle_change(0.0, 4.549999), angle)
+    # a station at a kink includes it
+    kink = np.arctan(2 * k * 6.000)
+    assert np.isclose(cable.angle_change(0.0, 4.550), angle + kink)
+    assert np.isclose(cable.angle_change(), angle + 2 * kink)
+    assert np.allclose(cable.cumulative_angle([0.0, 10.550]), [0.0, cable.angle_change()])
+    cable.update_control_point(3, 10.550, 2.303)
+    assert np.isclose(cable.angle_change(4.550, 10.550), 0.0)
+
+
+def test_force_profile():
+    cables = [
+        cableprofile.Cable2D([(0.000, 2.000), (10.000, 0.500)], ["parabolic"]),
+        cableprofile.Cable2D([(0.000, 1.000), (40.000, 1.000)], ["straight"]),
+    ]
+    x = np.linspace(0.000, 40.000, 40001)
+    force = force_profile(cables, x, [1.0e6, 2.0e6], 0.20, 0.002)
+    theta = cables[0].cumulative_angle(x[:10001])
+    s = cables[0].cumulative_length(x[:10001])
+    assert np.allclose(force[0, :10001], 1.0e6 * np.exp(-(0.20 * theta + 0.002 * s)))
+    assert np.isnan(force[0, 10001:]).all()
+    assert np.allclose(force[1], 2.0e6 * np.exp(-0.002 * x))
+    both = force_profile(cables[1], x, 2.0e6, 0.20, 0.002, jacking="both")
+    assert np.allclose(both, 2.0e6 * np.exp(-0.002 * np.minimum(x, 40.000 - x)))
+
+    # the anchor set takes anchor_set * E * A out of the force profile
+    locked = force_profile(
+        cables[1],
+        x,
+        2.0e6,
+        0.20,
+        0.002,
+        anchor_set=0.006,
+        elastic_modulus=195e9,
+        area=1e-3,
+    )
+    lost = force[1] - locked
+    area = (np.diff(x) * (lost[1:] + lost[:-1]) / 2).sum()
+    assert np.isclose(area, 0.006 * 195e9 * 1e-3)
+    set_length = np.sqrt(0.006 * 195e9 * 1e-3 / (2.0e6 * 0.002))
+    assert np.isclose(x[np.argmax(locked)], set_length, atol=0.5)
+    assert np.array_equal(locked[x > set_length + 0.5], force[1][x > set_length + 0.5])
+    with pytest.raises(ValueError):
+        force_profile(cables, x, 1.0e6, 0.20, 0.002, anchor_set=0.006)
+
+
+def test_Cable3D(cable):
+    elevation = cable
+    flat = cableprofile.Cable2D([(0.000, 0.300), (10.550, 0.300)], ["straight"])
+    cable = cableprofile.Cable3D(elevation, flat)
+    assert np.isclose(cable.length(), elevation.length())
+    x = np.linspace(0.000, 10.550, 50)
+    assert np.allclose(cable.cumulative_angle(x), elevation.cumulative_angle(x))
+
+    plan = cableprofile.Cable2D(
+        [(0.000, 0.000), (3.000, 0.400), (7.000, 0.400), (10.550, 0.000)],
+        ["parabolic", "straight", "parabolic"],
+    )
+    cable = cableprofile.Cable3D(elevation, plan)
+    coordinates = cable.profile(0.0001)
+    assert np.allclose(coordinates[:, 1:], np.column_stack(cable.evaluate(coordinates[:, 0])))
+    # the stations include the breaks of both profiles
+    assert np.isin([1.550, 3.000, 3.050, 7.000], cable.stations(0.500)).all()
+    chords = np.diff(coordinates, axis=0)
+    assert np.isclose(cable.length(), np.linalg.norm(chords, axis=1).sum())
+    tangents = chords / np.linalg.norm(chords, axis=1)[:, None]
+    turns = np.arccos(np.clip((tangents[:-1] * tangents[1:]).sum(axis=1), -1, 1))
+    assert np.isclose(cable.angle_change(), turns.sum(), rtol=1e-4)
+
+    line = cableprofile.Cable3D(
+        cableprofile.Cable2D([(0.000, 0.000), (10.000, 1.000)], ["straight"]),
+        cableprofile.Cable2D([(0.000, 0.000), (10.000, 2.000)], ["straight"]),
+    )
+    assert np.isclose(line.length(), np.sqrt(105.0))
+    assert line.angle_change() == 0.0
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_sweep(cable, jobs):
+    segment_types = cable.segment_type_list
+    parameters = {
+        (3, "y"): np.linspace(0.500, 2.000, 7),
+        (1, "x"): [1.000, 1.550, 5.000],
+        ((0, 2), "y"): [2.303, 2.500],
+    }
+    result = sweep(cable, parameters, jobs=jobs, chunk_size=10)
+    assert len(result) == 7 * 3 * 2
+    assert result.dtype.names[:3] == ("y3", "x1", "y0_2")
+    row = result[1 * 6 + 1 * 2 + 1]
+    assert (row["y3"], row["x1"], row["y0_2"]) == (0.750, 1.550, 2.500)
+    variant = cableprofile.Cable2D(
+        [(0.000, 2.500), (1.550, 2.233), (4.550, 2.500), (10.550, 0.750)],
+        segment_types,
+    )
+    coordinates = variant.profile(0.0001)
+    assert np.isclose(row["min_y"], coordinates[:, 1].min())
+    assert np.isclose(row["max_y"], coordinates[:, 1].max())
+    assert np.isclose(row["length"], variant.length())
+    assert np.isclose(row["angle_change"], variant.angle_change())
+    # point 1 behind point 2
+    assert np.isnan(result["length"][result["x1"] == 5.000]).all()
+
+
+def test_clearance():
+    lower = cableprofile.Cable2D(
+        [(0.000, 1.000), (10.000, 0.300), (20.000, 1.000)], ["parabolic"] * 2
+    )
+    upper = cableprofile.Cable2D(
+        [(0.000, 1.100), (10.000, 0.380), (20.000, 1.100)], ["parabolic"] * 2
+    )
+    crossing = cableprofile.Cable2D([(0.000, 0.200), (20.000, 1.200)], ["straight"])
+    far = cableprofile.Cable2D([(0.000, 3.000), (20.000, 3.000)], ["straight"])
+    cables = [lower, upper, crossing, far]
+
+    violations = clearance_violations(cables, 0.090)
+    pairs = violations[["cable", "other"]].tolist()
+    assert (0, 3) not in pairs and (1, 3) not in pairs and (2, 3) not in pairs
+    closest = violations[(violations["cable"] == 0) & (violations["other"] == 1)]
+    assert np.isclose(closest["separation"].min(), 0.080)
+    assert np.isclose(closest["station"][closest["separation"].argmin()], 10.000)
+    # the straight cable crosses the lower one where they are equal
+    cross = violations[(violations["cable"] == 0) & (violations["other"] == 2)]
+    x = cross["station"][cross["separation"] == 0.0]
+    assert len(x) == 1
+    assert np.allclose(lower.evaluate(x), crossing.evaluate(x))
+    assert len(clearance_violations(cables[:2], 0.075)) == 0
+
+    soffit = [(0.000, 0.000), (10.000, 0.250), (20.000, 0.000)]
+    violations = cover_violations(cables, soffit, 0.100)
+    assert violations[["cable", "station"]].tolist() == [(0, 10.0)]
+    assert np.isclose(violations["cover"][0], 0.050)
+    top = [(0.000, 3.050), (20.000, 3.050)]
+    violations = cover_violations(cables, top, 0.100, side="above")
+    assert set(violations["cable"]) == {3}
+    assert np.allclose(violations["cover"], 0.050)
+    with pytest.raises(ValueError):
+        cover_violations(cables, soffit, 0.100, side="left")
+
+
+def test_import_time():
+    # batch workers import the geometry core in many short-lived processes
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "from cableprofile import Cable2D\n"
+        "print(time.perf_counter() - start)\n"
+        "print([m for m in ('dash', 'pandas', 'plotly') if m in sys.modules])\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        env=env,
+        check=True,
+    )
+    seconds, modules = result.stdout.splitlines()
+    assert modules == "[]"
+    assert float(seconds) < 0.5
+
+    import cableprofile as package
+
+    assert package.Cable2D is cableprofile.Cable2D
+    assert set(package.__all__) <= set(dir(package))
+    with pytest.raises(AttributeError):
+        package.Cable4D
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_session_store(backend, tmp_path):
+    path = str(tmp_path / "sessions.db") if backend == "sqlite" else None
+    store = SessionStore(ttl=3600, path=path)
+    cable = cableprofile.Cable2D(
+        [(0.000, 1.000), (5.000, 0.500)], ["parabolic"], incremental=True
+    )
+    size = len(pickle.dumps(cable))
+    cable.profile(0.001)
+    # the profile kept in incremental mode is not pickled
+    assert len(pickle.dumps(cable)) == size
+    store.set("a", {"rows": [{"sl-no": 1}], "cable": cable})
+    state = store.get("a")
+    assert state["rows"] == [{"sl-no": 1}]
+    assert np.array_equal(state["cable"].profile(0.001), cable.profile(0.001))
+    assert store.get("b") is None
+    assert len(store) == 1
+    if path is not None:
+        # shared by every store using the file
+        assert SessionStore(path=path).get("a")["rows"] == [{"sl-no": 1}]
+    store.delete("a")
+    assert store.get("a") is None
+
+    expired = SessionStore(ttl=0, path=path)
+    expired.set("c", {"rows": []})
+    assert expired.get("c") is None
+    assert len(expired) == 0
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_download_profile_csv(cable, cached):
+    app.profile_cache.clear()
+    rows = table_rows(cable)
+    if cached:
+        app.get_profile(rows, 0.050, True)
+    download = {
+        "filename": "T1 profile.csv",
+        "rows": rows,
+        "interval": 0.050,
+        "symmetric": True,
+        "dtype": "float64",
+    }
+    client = app.server.test_client()
+    response = client.post("/download/profile", data={"request": json.dumps(download)})
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert "filename*=UTF-8''T1%20profile.csv" in response.headers["Content-Disposition"]
+    coordinates = cableprofile.mirror_profile(cable.profile(0.050))
+    expected = pd.DataFrame(coordinates, columns=["x", "y"]).to_csv()
+    assert response.get_data(as_text=True) == expected
+
+    download.update(rows=[], dtype="float32")
+    response = client.post("/download/profile", data={"request": json.dumps(download)})
+    assert response.get_data(as_text=True) == ",x,y\n"
+    # posted by the download_csv clientside callback; the other formats are
+    # sent by the save_profile callback
+    assert app.save_profile(1, "T1 profile.csv", rows, 0.050, True) == (
+        app.no_update,
+        app.no_update,
+        dict(download, rows=rows, dtype="float64"),
+    )
+    assert app.save_profile(1, "profile.npy", rows, 0.050, True)[0]["filename"] == (
+        "profile.npy"
+    )
+
+
+def test_plot_cleared_segment_type(cable):
+    # a segment type cleared in the table is left out, as Cable2D() does
+    app.profile_cache.clear()
+    rows = table_rows(cable)
+    rows[1]["segment_type"] = None
+    cleared = cableprofile.Cable2D(
+        cable.control_points_list, ["straight", None, "parabolic"]
+    )
+    fig, _, _ = app.plot_rows(rows, 0.050, False)
+    assert fig["data"][0]["x"] == cleared.profile(0.050)[:, 0].tolist()
+    # not plotted yet, so the csv is written from a new cable
+    csv = "".join(app.iter_profile_csv(rows, 0.100, False))
+    assert len(csv.splitlines()) == len(cleared.profile(0.100)) + 1
+    with pytest.raises(ValueError):
+        cableprofile.Cable2D.from_arrays(*cable.control_points.T, [0, -1, 1])
+    # and back once it is chosen again
+    rows[1]["segment_type"] = "reverse_curve"
+    coordinates = app.get_profile(rows, 0.050, False).to_numpy()
+    assert np.array_equal(coordinates, cable.profile(0.050))
+
+
+def test_background_profile(cable, monkeypatch, tmp_path):
+    # without diskcache here, a stand-in for the job manager
+    manager = SimpleNamespace(handle=SimpleNamespace(directory=str(tmp_path / "jobs")))
+    monkeypatch.setattr(app, "background_manager", manager)
+    monkeypatch.delenv("CABLEPROFILE_CACHE_DIR", raising=False)
+    directory = app.cache_directory()
+    assert directory == str(tmp_path / "jobs" / "profiles")
+    monkeypatch.setattr(app, "profile_cache", ProfileCache(directory=directory))
+    monkeypatch.setattr(app, "background_points", 1000)
+    monkeypatch.setattr(app, "progress_chunk_size", 100)
+
+    rows = table_rows(cable)
+    assert not app.in_background(rows, 0.050, False)
+    assert app.in_background(rows, 0.005, False)
+    # about 913 points, twice that when mirrored
+    assert not app.in_background(rows[:2], 0.005, False)
+    assert app.in_background(rows[:2], 0.005, True)
+    fig, request, key = app.plot_rows(rows, 0.005, False)
+    assert fig is app.no_update and key is app.no_update
+    assert request == {"rows": rows, "interval": 0.005, "symmetric": False}
+    figure, data, csv = app.save_profile(1, "profile.npy", rows, 0.005, False)
+    assert figure is app.no_update and csv is app.no_update
+    assert data == dict(request, filename="profile.npy", dtype="float64")
+
+    # a large csv is written to a file by the job, then fetched once
+    figure, data, csv = app.save_profile(1, "T1 profile.csv", rows, 0.005, False)
+    assert figure is app.no_update and csv is app.no_update
+    progress = []
+    figure, csv = app.save_profile_background(progress.append, data)
+    assert figure is app.no_update
+    total = cable.point_count(0.005)
+    assert [int(n) for n, _ in progress] == [total]
+    assert {int(t) for _, t in progress} == {total}
+    client = app.server.test_client()
+    response = client.get(csv["url"])
+    assert response.status_code == 200
+    assert "T1 profile.csv" in response.headers["Content-Disposition"]
+    expected = pd.DataFrame(cable.profile(0.005), columns=["x", "y"]).to_csv()
+    assert response.get_data(as_text=True) == expected
+    response.close()
+    assert os.listdir(tmp_path / "jobs" / "downloads") == []
+    assert client.get(csv["url"]).status_code == 404
+    assert client.get("/download/profile/profiles").status_code == 404
+
+    progress = []
+    fig, key = app.plot_cable_profile_background(progress.append, request)
+    total = cable.point_count(0.005)
+    assert [int(n) for n, _ in progress] == list(range(100, total, 100)) + [total]
+    assert {int(t) for _, t in progress} == {total}
+    # the job's profile reaches the web workers through the cache directory
+    assert np.array_equal(
+        ProfileCache(directory=directory).get(key), cable.profile(0.005)
+    )
+    assert not app.in_background(rows, 0.005, False)
+
+
+def apply_patch(figure, patch):
+    """Return a copy of a figure with the operations of a Dash Patch applied."""
+    figure = copy.deepcopy(figure)
+    for operation in patch.to_plotly_json()["operations"]:
+        *path, last = operation["location"]
+        target = figure
+        for key in path:
+            target = target[key]
+        if operation["operation"] == "Assign":
+            target[last] = operation["params"]["value"]
+        elif operation["operation"] == "Insert":
+            target[last].insert(operation["params"]["index"], operation["params"]["value"])
+        elif operation["operation"] == "Delete":
+            del target[last]
+        else:
+            raise ValueError(operation["operation"])
+    return figure
+
+
+def test_figure_patch(cable):
+    shown = cable.profile(0.050)
+    figure = app.profile_figure(shown)
+    replaced = shown.copy()
+    replaced[50:60, 1] += 0.010
+    inserted = np.insert(shown, 80, [(4.000, 2.000), (4.010, 2.010)], axis=0)
+    deleted = np.delete(shown, np.s_[100:105], axis=0)
+    for coordinates in (replaced, inserted, deleted, shown[:-3], shown[3:]):
+        patch = app.figure_patch(shown, coordinates)
+        assert isinstance(patch, Patch)
+        assert apply_patch(figure, patch) == app.profile_figure(coordinates)
+
+    # a moved control point, through the plot callback
+    app.displayed_cache.clear()
+    rows = table_rows(cable)
+    figure, _, key = app.plot_rows(rows, 0.050, False)
+    rows[1]["segment_start_y"] = rows[0]["segment_end_y"] = 2.250
+    patch, _, _ = app.plot_rows(rows, 0.050, False, shown_key=key)
+    assert isinstance(patch, Patch)
+    cable.update_control_point(1, 1.550, 2.250)
+    assert apply_patch(figure, patch) == app.profile_figure(cable.profile(0.050))
+
+    # the whole figure is sent when most points change, when the trace
+    # switches between SVG and WebGL, or from or to an empty profile
+    moved = shown.copy()
+    moved[:, 1] += 0.010
+    assert app.figure_patch(shown, moved) is None
+    dense = cable.profile(0.010)
+    assert len(shown) <= app.webgl_threshold < len(dense)
+    assert app.figure_patch(shown, dense) is None
+    assert app.figure_patch(dense, shown) is None
+    assert app.figure_patch(shown, shown[:0]) is None
+    assert app.figure_patch(shown, shown.copy()) is app.no_update
+
+
+def test_session_rows(cable, monkeypatch):
+    monkeypatch.setattr(app, "session_store", SessionStore())
+    app.profile_cache.clear()
+    columns = None
+    rows = table_rows(cable)
+    # the whole table starts the session
+    diff = {"session": "s", "version": 1, "rows": rows}
+    fig, _, key, status = app.plot_cable_profile(diff, columns, 0.050, False)
+    assert status is app.no_update
+    assert fig["data"][0]["y"] == cable.profile(0.050)[:, 1].tolist()
+    assert app.session_store.get("s")["version"] == 1
+
+    # then only the changed rows are sent
+    edited = copy.deepcopy(rows)
+    edited[1]["segment_start_y"] = edited[0]["segment_end_y"] = 2.250
+    diff = {
+        "session": "s",
+        "version": 2,
+        "base": 1,
+        "n_rows": 3,
+        "changes": {"0": edited[0], "1": edited[1]},
+    }
+    assert app.session_rows(diff)[0] == edited
+    app.plot_cable_profile(diff, columns, 0.050, False, key)
+    state = app.session_store.get("s")
+    assert (state["rows"], state["version"]) == (edited, 2)
+    cable.update_control_point(1, 1.550, 2.250)
+    assert np.array_equal(state["cable"].control_points, cable.control_points)
+    # the same diff again when the interval changes, on the rows it left
+    fig, _, _, status = app.plot_cable_profile(diff, columns, 0.020, False)
+    assert status is app.no_update
+    assert fig["data"][0]["y"] == cable.profile(0.020)[:, 1].tolist()
+    assert app.session_store.get("s")["version"] == 2
+
+    # deleting the middle row shifts the last one up
+    deleted = [dict(edited[0], segment_end_x=4.550, segment_end_y=2.303), edited[2]]
+    diff = {
+        "session": "s",
+        "version": 3,
+        "base": 2,
+        "n_rows": 2,
+        "changes": {"0": deleted[0], "1": deleted[1]},
+    }
+    rows, state = app.session_rows(diff)
+    assert rows == deleted and state["version"] == 3
+
+    # a diff on a version the server does not have asks for the whole table
+    diff = dict(diff, version=4, base=3)
+    fig, request, key, status = app.plot_cable_profile(diff, columns, 0.050, False)
+    assert fig is request is key is app.no_update
+    assert "resync" in status
+    assert app.session_rows(dict(diff, session="unknown")) == (None, None)
+    fig, _, key = app.resync_session(status, deleted, diff, 0.050, False, None)
+    expected = cableprofile.Cable2D(
+        [(0.000, 2.325), (4.550, 2.303), (10.550, 1.945)], ["straight", "parabolic"]
+    ).profile(0.050)
+    assert fig["data"][0]["y"] == expected[:, 1].tolist()
+    assert app.session_store.get("s")["version"] == 4
+    diff = dict(diff, version=5, base=4, changes={})
+    assert app.session_rows(diff)[0] == deleted
+
+
+def test_command_line_profile_outputs(tmp_path, monkeypatch):
+    schedule = (
+        "segment_type,segment_start_x,segment_start_y,segment_end_x,segment_end_y\n"
+        "straight,0.0,1.0,2.0,1.5\n"
+        "parabolic,2.0,1.5,6.0,0.5\n"
+    )
+    (tmp_path / "T.csv").write_text(schedule)
+    # a profile written earlier is not read as a schedule
+    (tmp_path / "old.csv").write_text("x,y\n0.0,1.0\n")
+    monkeypatch.chdir(tmp_path)
+    runner = CliRunner()
+    for _ in range(2):
+        result = runner.invoke(cli.main, ["profile", "."])
+        assert result.exit_code == 0, result.output
+        assert (tmp_path / "T.csv").read_text() == schedule
+        assert sorted(p.name for p in (tmp_path / "profiles").iterdir()) == ["T.csv"]
+    result = runner.invoke(cli.main, ["profile", ".", "-o", "."])
+    assert result.exit_code != 0
+    assert "would overwrite" in result.output
+    assert (tmp_path / "T.csv").read_text() == schedule
+    result = runner.invoke(cli.main, ["profile", "old.csv"])
+    assert result.exit_code != 0
+
+
+@pytest.mark.parametrize(
+    "segment_types", [["straight", "parabolc"], ["straight"], ["straight"] * 3]
+)
+def test_command_line_profile_invalid(segment_types, tmp_path):
+    cable = {
+        "name": "T9",
+        "control_points": [[0.000, 1.000], [2.000, 1.500], [6.000, 0.500]],
+        "segment_types": segment_types,
+    }
+    (tmp_path / "bad.json").write_text(json.dumps(cable))
+    output = tmp_path / "profiles"
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.main, ["profile", str(tmp_path / "bad.json"), "-o", str(output)]
+    )
+    assert result.exit_code != 0
+    assert "T9" in result.output and "bad.json" in result.output
+    assert not output.exists()